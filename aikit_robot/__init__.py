@@ -4,3 +4,9 @@ from . import planning
 from .planning import *
 from . import rigid_mobile
 from .rigid_mobile import *
+from . import profiling
+from .profiling import *
+from . import geometry
+from .geometry import *
+from . import constant_cache
+from .constant_cache import *
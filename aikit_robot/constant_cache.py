@@ -0,0 +1,99 @@
+"""Constant cache, serving robot constants as native arrays for the active backend,
+device and dtype"""
+
+# global
+import aikit
+from collections import OrderedDict
+
+CONSTANT_CACHE_SIZE = 256
+
+
+class ConstantCache:
+    def __init__(self, cache_size=CONSTANT_CACHE_SIZE):
+        """Initialize constant cache instance. Constants are registered as host
+        values, and converted lazily to native arrays the first time they are
+        requested for a given backend, device and dtype. The converted arrays are
+        then reused, so switching between backends does not re-convert any
+        constant. Arrays are cached without any batch dimensions, so that varying
+        batch sizes do not churn the cache, and are broadcast by the caller.
+
+        Parameters
+        ----------
+        cache_size
+            Maximum number of converted arrays to keep, with the least recently used
+            arrays evicted first. (Default value = 256)
+
+        """
+        self._cache_size = cache_size
+        self._values = dict()
+        self._arrays = OrderedDict()
+
+    def __contains__(self, name):
+        return name in self._values
+
+    # Public Methods #
+    # ---------------#
+
+    def register(self, name, values):
+        """Register a constant, replacing any constant of the same name.
+
+        Parameters
+        ----------
+        name
+            Hashable name of the constant.
+        values
+            Host values of the constant, as a nested list or an array.
+
+        """
+        if not isinstance(values, (list, tuple, float, int)):
+            values = aikit.to_list(values)
+        self._values[name] = values
+        for key in [k for k in self._arrays if k[0] == name]:
+            del self._arrays[key]
+
+    def unregister(self, name):
+        """Remove a constant, along with all of its converted arrays.
+
+        Parameters
+        ----------
+        name
+            Name of the constant.
+
+        """
+        self._values.pop(name, None)
+        for key in [k for k in self._arrays if k[0] == name]:
+            del self._arrays[key]
+
+    def get(self, name, dtype, device):
+        """Get a registered constant as a native array of the active backend.
+
+        Parameters
+        ----------
+        name
+            Name of the constant.
+        dtype
+            Data type of the returned array.
+        device
+            Device of the returned array.
+
+        Returns
+        -------
+        ret
+            The constant array
+
+        """
+        key = (name, aikit.current_backend_str(), str(device), str(dtype))
+        if key in self._arrays:
+            self._arrays.move_to_end(key)
+            return self._arrays[key]
+        if name not in self._values:
+            raise Exception("No constant registered with name {}".format(name))
+        array = aikit.array(self._values[name], dtype=dtype, device=device)
+        self._arrays[key] = array
+        if len(self._arrays) > self._cache_size:
+            self._arrays.popitem(last=False)
+        return array
+
+    def clear(self):
+        """Clear all converted arrays, keeping the registered host values."""
+        self._arrays.clear()
@@ -0,0 +1,237 @@
+"""Collection of distance functions between points, spheres, segments and capsules,
+used as collision geometry for robot links"""
+
+# global
+import aikit
+
+MIN_DENOMINATOR = 1e-12
+
+
+def _dot(x1, x2):
+    return aikit.sum(x1 * x2, axis=-1)
+
+
+def point_segment_distance(points, segment_starts, segment_ends):
+    """Compute the distances between points and line segments.
+
+    Parameters
+    ----------
+    points
+        Cartesian points *[batch_shape,3]*
+    segment_starts
+        Start points of the segments *[batch_shape,3]*
+    segment_ends
+        End points of the segments *[batch_shape,3]*
+
+    Returns
+    -------
+    ret
+        The distances *[batch_shape]*
+
+    """
+    # BS x 3
+    directions = segment_ends - segment_starts
+
+    # BS
+    fractions = aikit.clip(
+        _dot(points - segment_starts, directions)
+        / aikit.maximum(_dot(directions, directions), MIN_DENOMINATOR),
+        0.0,
+        1.0,
+    )
+
+    # BS x 3
+    closest_points = segment_starts + aikit.expand_dims(fractions, axis=-1) * directions
+
+    # BS
+    return aikit.vector_norm(points - closest_points, axis=-1)
+
+
+def segment_segment_distance(starts_a, ends_a, starts_b, ends_b):
+    """Compute the distances between pairs of line segments, from their closest
+    points. Degenerate segments of zero length are treated as points.
+
+    Based on the closest point computation in:
+    Real-Time Collision Detection. Christer Ericson
+    section 5.1.9
+
+    Parameters
+    ----------
+    starts_a
+        Start points of the first segments *[batch_shape,3]*
+    ends_a
+        End points of the first segments *[batch_shape,3]*
+    starts_b
+        Start points of the second segments *[batch_shape,3]*
+    ends_b
+        End points of the second segments *[batch_shape,3]*
+
+    Returns
+    -------
+    ret
+        The distances *[batch_shape]*
+
+    """
+    # BS x 3
+    directions_a = ends_a - starts_a
+    directions_b = ends_b - starts_b
+    offsets = starts_a - starts_b
+
+    # BS
+    sqrd_len_a = _dot(directions_a, directions_a)
+    sqrd_len_b = _dot(directions_b, directions_b)
+    dir_dot = _dot(directions_a, directions_b)
+    offset_dot_a = _dot(directions_a, offsets)
+    offset_dot_b = _dot(directions_b, offsets)
+    safe_sqrd_len_a = aikit.maximum(sqrd_len_a, MIN_DENOMINATOR)
+    safe_sqrd_len_b = aikit.maximum(sqrd_len_b, MIN_DENOMINATOR)
+
+    # closest point fractions along the infinite lines, with the first fraction set
+    # to zero for parallel segments
+    denominator = sqrd_len_a * sqrd_len_b - dir_dot**2
+    fractions_a = aikit.where(
+        denominator > MIN_DENOMINATOR,
+        aikit.clip(
+            (dir_dot * offset_dot_b - offset_dot_a * sqrd_len_b)
+            / aikit.maximum(denominator, MIN_DENOMINATOR),
+            0.0,
+            1.0,
+        ),
+        aikit.zeros_like(denominator),
+    )
+    fractions_b = (dir_dot * fractions_a + offset_dot_b) / safe_sqrd_len_b
+
+    # clamp the second fraction to the segment, and recompute the first
+    fractions_a = aikit.where(
+        fractions_b < 0,
+        aikit.clip(-offset_dot_a / safe_sqrd_len_a, 0.0, 1.0),
+        aikit.where(
+            fractions_b > 1,
+            aikit.clip((dir_dot - offset_dot_a) / safe_sqrd_len_a, 0.0, 1.0),
+            fractions_a,
+        ),
+    )
+    fractions_b = aikit.clip(fractions_b, 0.0, 1.0)
+
+    # second segments which are points
+    degenerate_b = sqrd_len_b <= MIN_DENOMINATOR
+    fractions_a = aikit.where(
+        degenerate_b,
+        aikit.clip(-offset_dot_a / safe_sqrd_len_a, 0.0, 1.0),
+        fractions_a,
+    )
+    fractions_b = aikit.where(degenerate_b, aikit.zeros_like(fractions_b), fractions_b)
+
+    # BS x 3
+    closest_a = starts_a + aikit.expand_dims(fractions_a, axis=-1) * directions_a
+    closest_b = starts_b + aikit.expand_dims(fractions_b, axis=-1) * directions_b
+
+    # BS
+    return aikit.vector_norm(closest_a - closest_b, axis=-1)
+
+
+def point_sphere_distance(points, centres, radii):
+    """Compute the signed distances between points and spheres, negative for
+    points inside the spheres.
+
+    Parameters
+    ----------
+    points
+        Cartesian points *[batch_shape,3]*
+    centres
+        Centres of the spheres *[batch_shape,3]*
+    radii
+        Radii of the spheres *[batch_shape]*
+
+    Returns
+    -------
+    ret
+        The signed distances *[batch_shape]*
+
+    """
+    return aikit.vector_norm(points - centres, axis=-1) - radii
+
+
+def point_capsule_distance(points, capsule_starts, capsule_ends, capsule_radii):
+    """Compute the signed distances between points and capsules, negative for
+    points inside the capsules.
+
+    Parameters
+    ----------
+    points
+        Cartesian points *[batch_shape,3]*
+    capsule_starts
+        Start points of the capsule axes *[batch_shape,3]*
+    capsule_ends
+        End points of the capsule axes *[batch_shape,3]*
+    capsule_radii
+        Radii of the capsules *[batch_shape]*
+
+    Returns
+    -------
+    ret
+        The signed distances *[batch_shape]*
+
+    """
+    return point_segment_distance(points, capsule_starts, capsule_ends) - capsule_radii
+
+
+def sphere_capsule_distance(
+    centres, radii, capsule_starts, capsule_ends, capsule_radii
+):
+    """Compute the signed distances between spheres and capsules, negative for
+    intersecting pairs.
+
+    Parameters
+    ----------
+    centres
+        Centres of the spheres *[batch_shape,3]*
+    radii
+        Radii of the spheres *[batch_shape]*
+    capsule_starts
+        Start points of the capsule axes *[batch_shape,3]*
+    capsule_ends
+        End points of the capsule axes *[batch_shape,3]*
+    capsule_radii
+        Radii of the capsules *[batch_shape]*
+
+    Returns
+    -------
+    ret
+        The signed distances *[batch_shape]*
+
+    """
+    return (
+        point_capsule_distance(centres, capsule_starts, capsule_ends, capsule_radii)
+        - radii
+    )
+
+
+def capsule_capsule_distance(starts_a, ends_a, radii_a, starts_b, ends_b, radii_b):
+    """Compute the signed distances between pairs of capsules, negative for
+    intersecting pairs.
+
+    Parameters
+    ----------
+    starts_a
+        Start points of the first capsule axes *[batch_shape,3]*
+    ends_a
+        End points of the first capsule axes *[batch_shape,3]*
+    radii_a
+        Radii of the first capsules *[batch_shape]*
+    starts_b
+        Start points of the second capsule axes *[batch_shape,3]*
+    ends_b
+        End points of the second capsule axes *[batch_shape,3]*
+    radii_b
+        Radii of the second capsules *[batch_shape]*
+
+    Returns
+    -------
+    ret
+        The signed distances *[batch_shape]*
+
+    """
+    return (
+        segment_segment_distance(starts_a, ends_a, starts_b, ends_b) - radii_a - radii_b
+    )
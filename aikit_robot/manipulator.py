@@ -4,8 +4,521 @@
 import aikit
 import math
 import aikit_mech
+from collections import OrderedDict
+
+# local
+from aikit_robot.constant_cache import ConstantCache
+from aikit_robot.geometry import capsule_capsule_distance, point_capsule_distance
 
 MIN_DENOMINATOR = 1e-12
+SNAP_TOLERANCE = 1e-6
+LINK_RADIUS_RATIO = 0.1
+LINK_SAMPLING_WEIGHTS_CACHE_SIZE = 16
+
+
+def _compose_affine(mats_a, mats_b):
+    # Composition of 3 x 4 affine transformations [R1|t1] [R2|t2] = [R1 R2|R1 t2 + t1],
+    # without carrying the constant bottom row of the homogeneous matrices.
+
+    # ... x 3 x 4
+    rotated = aikit.matmul(mats_a[..., 0:3], mats_b)
+    return aikit.concat(
+        (rotated[..., 0:3], rotated[..., 3:] + mats_a[..., 3:]), axis=-1
+    )
+
+
+def _cumulative_matmul(mats, compose=aikit.matmul):
+    # Inclusive prefix products M_1, M_1 M_2, ..., M_1 ... M_N of a chain of matrices
+    # along the third last axis, composed with a parallel-prefix (Hillis-Steele)
+    # scan. Matrix multiplication is associative, so the chain is built in
+    # ceil(log2(N)) batched matmuls rather than N sequential ones.
+    num_mats = mats.shape[-3]
+    offset = 1
+    while offset < num_mats:
+        mats = aikit.concat(
+            (
+                mats[..., :offset, :, :],
+                compose(mats[..., :-offset, :, :], mats[..., offset:, :, :]),
+            ),
+            axis=-3,
+        )
+        offset *= 2
+    return mats
+
+
+class ForwardKinematics:
+    def __init__(self, manipulator, link_matrices, batch_shape):
+        """Initialize forward kinematics result instance, holding the matrices of all
+        links of a manipulator for a batch of joint angles. Any number of links,
+        poses and link samples can be served from a single forward kinematics pass.
+        Instances are created with :meth:`Manipulator.compute_forward_kinematics`.
+
+        Parameters
+        ----------
+        manipulator
+            The manipulator the forward kinematics were computed for.
+        link_matrices
+            Homogeneous or affine transformation matrices of all links relative to
+            base frame *[batch_shape,num_joints+1,4,4]* or
+            *[batch_shape,num_joints+1,3,4]*
+        batch_shape
+            Shape of batch.
+
+        """
+        self._manipulator = manipulator
+        self._batch_shape = list(batch_shape)
+        self._num_joints = link_matrices.shape[-3] - 1
+        if link_matrices.shape[-2] == 4:
+            self._link_matrices = link_matrices
+            self._link_affine_matrices = link_matrices[..., 0:3, :]
+        else:
+            self._link_matrices = None
+            self._link_affine_matrices = link_matrices
+        self._link_poses = dict()
+
+    # Private Methods #
+    # ----------------#
+
+    def _check_link_num(self, link_num):
+        if link_num is None:
+            return self._num_joints
+        if not 1 <= link_num <= self._num_joints:
+            raise Exception(
+                "wrong parameter entered for link_num, please enter integer from 1-"
+                + str(self._num_joints)
+            )
+        return link_num
+
+    # Properties #
+    # -----------#
+
+    @property
+    def batch_shape(self):
+        return self._batch_shape
+
+    # Public Methods #
+    # ---------------#
+
+    def link_matrices(self, link_num=None):
+        """Homogeneous transformation matrices relative to base frame, up to
+        link_num of links.
+
+        Parameters
+        ----------
+        link_num
+            Link number for which to return matrices up to. Default is the last link.
+
+        Returns
+        -------
+        ret
+            The link matrices, up to link_num *[batch_shape,link_num+1,4,4]*
+
+        """
+        link_num = self._check_link_num(link_num)
+        if self._link_matrices is None:
+            # BS x NJ+1 x 1 x 4
+            bottom_row = aikit.zeros_like(self._link_affine_matrices[..., 0:1, :])
+            bottom_row = aikit.concat(
+                (bottom_row[..., 0:3], bottom_row[..., 3:] + 1), axis=-1
+            )
+
+            # BS x NJ+1 x 4 x 4
+            self._link_matrices = aikit.concat(
+                (self._link_affine_matrices, bottom_row), axis=-2
+            )
+        return self._link_matrices[..., 0 : link_num + 1, :, :]
+
+    def link_affine_matrices(self, link_num=None):
+        """Affine transformation matrices relative to base frame, up to link_num of
+        links, without the constant bottom row of the homogeneous matrices.
+
+        Parameters
+        ----------
+        link_num
+            Link number for which to return matrices up to. Default is the last link.
+
+        Returns
+        -------
+        ret
+            The link matrices, up to link_num *[batch_shape,link_num+1,3,4]*
+
+        """
+        link_num = self._check_link_num(link_num)
+        return self._link_affine_matrices[..., 0 : link_num + 1, :, :]
+
+    def link_poses(self, link_num=None, rotation_format="rot_vec"):
+        """Poses for link_num of links, starting from link 0. The poses of all links
+        are converted once per rotation format, and then reused.
+
+        Parameters
+        ----------
+        link_num
+            Link number for which to return poses up to. Default is the last link.
+        rotation_format
+            Format of the pose rotations, either "rot_vec" for rotation vectors, or
+            "quaternion" for unit quaternions. (Default value = "rot_vec")
+
+        Returns
+        -------
+        ret
+            The link poses, up to link_num *[batch_shape,link_num+1,6]* for
+            rotation vectors, or *[batch_shape,link_num+1,7]* for quaternions.
+
+        """
+        link_num = self._check_link_num(link_num)
+        if rotation_format not in self._link_poses:
+            if rotation_format == "rot_vec":
+                # BS x NJ+1 x 6
+                poses = aikit_mech.mat_pose_to_rot_vec_pose(self._link_affine_matrices)
+            elif rotation_format == "quaternion":
+                # BS x NJ+1 x 7
+                poses = aikit.concat(
+                    (
+                        self._link_affine_matrices[..., 3],
+                        aikit_mech.rot_mat_to_quaternion(
+                            self._link_affine_matrices[..., 0:3]
+                        ),
+                    ),
+                    axis=-1,
+                )
+            else:
+                raise Exception(
+                    "Invalid rotation_format {}, must be one of: rot_vec, "
+                    "quaternion".format(rotation_format)
+                )
+            self._link_poses[rotation_format] = poses
+        return self._link_poses[rotation_format][..., 0 : link_num + 1, :]
+
+    def jacobian(self, link_num=None, all_links=False):
+        """Geometric jacobian of the given link, relative to base frame, computed
+        from the link matrices of the forward kinematics pass for all batch
+        elements at once.
+
+        Using same nomenclature as in:
+        Modelling, Planning and Control. Bruno Siciliano, Lorenzo Sciavicco,
+        Luigi Villani, Giuseppe Oriolo
+        page 111 - 113
+
+        Parameters
+        ----------
+        link_num
+            Link number for which to compute the jacobian. Default is the last link.
+        all_links
+            Whether to return the jacobians of every link up to link_num, instead of
+            only link_num. (Default value = False)
+
+        Returns
+        -------
+        ret
+            The geometric jacobian, with linear velocity rows followed by angular
+            velocity rows, *[batch_shape,6,num_joints]*, or
+            *[batch_shape,link_num,6,num_joints]* if all_links is True.
+
+        """
+        link_num = self._check_link_num(link_num)
+        link_ids = list(range(1, link_num + 1)) if all_links else [link_num]
+
+        # BS x NJ+1 x 3
+        positions = self._link_affine_matrices[..., 3]
+
+        # BS x 1 x NJ x 3, joint axes z_{i-1} and origins p_{i-1}
+        z_axes = aikit.expand_dims(self._link_affine_matrices[..., :-1, :, 2], axis=-3)
+        joint_positions = aikit.expand_dims(positions[..., :-1, :], axis=-3)
+
+        # BS x L x 1 x 3
+        end_positions = aikit.expand_dims(
+            positions[..., link_ids[0] : link_ids[-1] + 1, :], axis=-2
+        )
+
+        # BS x L x NJ x 3
+        offsets = end_positions - joint_positions
+        angular = z_axes + aikit.zeros_like(offsets)
+        linear = aikit.cross(angular, offsets)
+
+        # L x NJ x 1, only joints before the link move it
+        mask = self._manipulator._constant("jacobian_mask", offsets)[
+            link_ids[0] - 1 : link_ids[-1]
+        ]
+
+        # NJ x 1, chain rule through the Denavit-Hartenberg joint scales
+        scales = aikit.expand_dims(
+            self._manipulator._constant("dh_joint_scales", offsets), axis=-1
+        )
+
+        # BS x L x 6 x NJ
+        jacobians = aikit.swapaxes(
+            aikit.concat((linear, angular), axis=-1) * mask * scales, -1, -2
+        )
+        if all_links:
+            return jacobians
+        # BS x 6 x NJ
+        return jacobians[..., 0, :, :]
+
+    def manipulability_metrics(
+        self, link_num=None, translational_only=False, singularity_threshold=1e-3
+    ):
+        """Manipulability and singularity metrics of the given link, from the
+        singular values of its geometric jacobian.
+
+        Parameters
+        ----------
+        link_num
+            Link number for which to compute the metrics. Default is the last link.
+        translational_only
+            Whether to only consider the linear velocity rows of the jacobian.
+            (Default value = False)
+        singularity_threshold
+            Minimum singular value below which a configuration is considered
+            singular. (Default value = 1e-3)
+
+        Returns
+        -------
+        ret
+            The Yoshikawa manipulability, as the product of the singular values
+            *[batch_shape]*, the minimum singular value *[batch_shape]*, the
+            condition number *[batch_shape]*, and the singularity mask
+            *[batch_shape]*
+
+        """
+        # BS x 6 x NJ
+        jacobian = self.jacobian(link_num)
+        if translational_only:
+            # BS x 3 x NJ
+            jacobian = jacobian[..., 0:3, :]
+
+        # BS x min(R,NJ)
+        singular_values = aikit.svdvals(jacobian)
+
+        # BS
+        manipulability = aikit.prod(singular_values, axis=-1)
+        min_singular_values = aikit.min(singular_values, axis=-1)
+        condition_numbers = aikit.max(singular_values, axis=-1) / aikit.maximum(
+            min_singular_values, MIN_DENOMINATOR
+        )
+        return (
+            manipulability,
+            min_singular_values,
+            condition_numbers,
+            min_singular_values < singularity_threshold,
+        )
+
+    def sample_links(self, link_num=None, samples_per_metre=25):
+        """Sample links of the robot at uniformly distributed cartesian positions.
+
+        Parameters
+        ----------
+        link_num
+            Link number for which to sample links up to. Default is the last link.
+        samples_per_metre
+            Number of samples per metre of robot link (Default value = 25)
+
+        Returns
+        -------
+        ret
+            The sampled link cartesian positions
+            *[batch_shape,total_sampling_chain_length,3]*
+
+        """
+        link_num = self._check_link_num(link_num)
+        return self._manipulator._sample_links(
+            self.link_affine_matrices(link_num), link_num, samples_per_metre
+        )
+
+    def link_capsules(self, link_num=None):
+        """Capsules around the links of the robot, in the world reference frame, with
+        the axis of each link running between consecutive link frame origins.
+
+        Parameters
+        ----------
+        link_num
+            Link number for which to return capsules up to. Default is the last link.
+
+        Returns
+        -------
+        ret
+            The capsule start points *[batch_shape,link_num,3]*, end points
+            *[batch_shape,link_num,3]* and radii *[link_num]*
+
+        """
+        link_num = self._check_link_num(link_num)
+
+        # BS x LN+1 x 3
+        link_positions = self._manipulator._world_link_positions(
+            self.link_affine_matrices(link_num)
+        )
+
+        # LN
+        radii = self._manipulator._constant("link_radii", link_positions)[0:link_num]
+        return link_positions[..., :-1, :], link_positions[..., 1:, :], radii
+
+    def link_spheres(self, link_num=None, spheres_per_link=2):
+        """Spheres evenly spaced along the links of the robot, in the world reference
+        frame, which together cover the cylinder of each link capsule.
+
+        Parameters
+        ----------
+        link_num
+            Link number for which to return spheres up to. Default is the last link.
+        spheres_per_link
+            Number of spheres along each link (Default value = 2)
+
+        Returns
+        -------
+        ret
+            The sphere centres *[batch_shape,link_num*spheres_per_link,3]* and radii
+            *[link_num*spheres_per_link]*
+
+        """
+        link_num = self._check_link_num(link_num)
+
+        # BS x LN x 3, LN
+        starts, ends, capsule_radii = self.link_capsules(link_num)
+
+        # K x 1
+        fractions = aikit.array(
+            [[(i + 0.5) / spheres_per_link] for i in range(spheres_per_link)],
+            dtype=starts.dtype,
+            device=aikit.dev(starts),
+        )
+
+        # BS x LN x K x 3
+        centres = aikit.expand_dims(starts, axis=-2) + fractions * aikit.expand_dims(
+            ends - starts, axis=-2
+        )
+
+        # LN
+        half_spacings = self._manipulator._constant("link_lengths", starts)[
+            0:link_num
+        ] / (2 * spheres_per_link)
+
+        # LN x K
+        radii = aikit.expand_dims(
+            (capsule_radii**2 + half_spacings**2) ** 0.5, axis=-1
+        ) + aikit.zeros_like(aikit.swapaxes(fractions, 0, 1))
+
+        # BS x LNxK x 3, LNxK
+        return (
+            aikit.reshape(centres, list(centres.shape[:-3]) + [-1, 3]),
+            aikit.reshape(radii, (-1,)),
+        )
+
+    def link_distances(self, points, link_num=None, point_radii=None):
+        """Signed distances between query points, or spheres, and the capsules around
+        the links of the robot, negative for points inside the capsules.
+
+        Parameters
+        ----------
+        points
+            Cartesian query points, in the world reference frame
+            *[batch_shape,num_points,3]*
+        link_num
+            Link number for which to compute distances up to. Default is the last
+            link.
+        point_radii
+            Radii of spheres centred at the query points *[num_points]*. The points
+            are treated as points if None. (Default value = None)
+
+        Returns
+        -------
+        ret
+            The signed distances *[batch_shape,num_points,link_num]*
+
+        """
+        # BS x LN x 3, LN
+        starts, ends, radii = self.link_capsules(link_num)
+
+        # BS x P x LN
+        distances = point_capsule_distance(
+            aikit.expand_dims(points, axis=-2),
+            aikit.expand_dims(starts, axis=-3),
+            aikit.expand_dims(ends, axis=-3),
+            radii,
+        )
+        if point_radii is None:
+            return distances
+        return distances - aikit.expand_dims(point_radii, axis=-1)
+
+    def self_collisions(self, link_pairs=None, safety_margin=0.0):
+        """Self-collision check between pairs of link capsules, from the exact
+        signed distances between the capsules of all pairs.
+
+        Parameters
+        ----------
+        link_pairs
+            Pairs of link numbers (i, j) to check, from 1 to num_joints. Default is
+            all pairs of links which are not adjacent, or only separated by links of
+            zero length.
+        safety_margin
+            Distance between link capsules below which they are considered
+            colliding. (Default value = 0.0)
+
+        Returns
+        -------
+        ret
+            The minimum signed distance between the checked link capsules
+            *[batch_shape]*, and the collision mask *[batch_shape]*
+
+        """
+        if link_pairs is None:
+            link_pairs = self._manipulator._self_collision_pairs
+        if len(link_pairs) == 0:
+            raise Exception("no link pairs to check for self-collisions")
+
+        # BS x NJ x 3, NJ
+        starts, ends, radii = self.link_capsules()
+
+        # BS x P x 3, BS x P, for the first and second links of each pair
+        capsules = list()
+        for ids in ([i - 1 for i, _ in link_pairs], [j - 1 for _, j in link_pairs]):
+            ids = aikit.array(ids, dtype="int64", device=aikit.dev(starts))
+            pair_starts = aikit.gather(starts, ids, axis=-2)
+            pair_ends = aikit.gather(ends, ids, axis=-2)
+            pair_radii = aikit.gather(radii, ids, axis=0) + aikit.zeros_like(
+                pair_starts[..., 0]
+            )
+            capsules.append((pair_starts, pair_ends, pair_radii))
+
+        # BS x P, exact capsule distances of all pairs, which are only a few
+        # elementwise ops per pair, so no bounding volume broad phase is used
+        distances = capsule_capsule_distance(*capsules[0], *capsules[1])
+
+        # BS
+        min_distances = aikit.min(distances, axis=-1)
+        return min_distances, min_distances < safety_margin
+
+
+def _pose_error(mats, target_mats, orientation_weight):
+    # Position error, and orientation error from the cross products of the
+    # rotation matrix columns, see Siciliano et al. page 139, stacked as
+    # *[batch_shape,6]*
+
+    # BS x 3
+    position_error = target_mats[..., 0:3, 3] - mats[..., 0:3, 3]
+
+    # BS x 3 x 3, columns as rows
+    cols = aikit.swapaxes(mats[..., 0:3, 0:3], -1, -2)
+    target_cols = aikit.swapaxes(target_mats[..., 0:3, 0:3], -1, -2)
+
+    # BS x 3
+    orientation_error = 0.5 * aikit.sum(aikit.cross(cols, target_cols), axis=-2)
+
+    # BS x 6
+    return aikit.concat(
+        (position_error, orientation_weight * orientation_error), axis=-1
+    )
+
+
+def _reverse_cumsum(x, axis):
+    return aikit.flip(aikit.cumsum(aikit.flip(x, axis=axis), axis=axis), axis=axis)
+
+
+def _snap_to_unit(values, tol=SNAP_TOLERANCE):
+    # Snap values within tol of 0, 1 or -1 to exactly that value, so that for
+    # instance cos(pi/2) is an exact zero rather than -4.4e-8 in single precision.
+    return [
+        float(round(v)) if abs(v) < 1.5 and abs(v - round(v)) < tol else v
+        for v in values
+    ]
 
 
 # noinspection PyUnresolvedReferences
@@ -18,6 +531,10 @@ class Manipulator:
         dh_joint_scales,
         dh_joint_offsets,
         base_inv_ext_mat=None,
+        chain_composition="scan",
+        fk_cache_size=0,
+        specialise_fk=True,
+        chain_representation="affine",
     ):
         """
         Initialize robot manipulator instance
@@ -36,81 +553,349 @@ class Manipulator:
             Scalar offsets to apply to input joints *[num_joints]*
         base_inv_ext_mat
             Inverse extrinsic matrix of the robot base *[4,4]*
+        chain_composition
+            How to compose the kinematic chain, either "scan" for a parallel-prefix
+            scan of logarithmic depth in the number of joints, or "sequential".
+            (Default value = "scan")
+        fk_cache_size
+            Number of forward kinematics results to keep in a cache keyed on the
+            identity of the joint angles array, so that repeated queries for the
+            same array reuse a single forward kinematics pass. The cache must only
+            be enabled if joint angle arrays are not modified in-place.
+            (Default value = 0)
+        specialise_fk
+            Whether to compute the joint matrices with an evaluator specialised to
+            the constant Denavit–Hartenberg structure, gathering the entries of each
+            joint from its joint angle cosine and sine with the parameters which are
+            exactly 0 or ±1 folded per joint, and precomputing the batch-independent
+            bottom rows. Manipulators with link twists other than multiples of pi/2
+            always use the generic evaluator. (Default value = True)
+        chain_representation
+            Representation in which to compose the kinematic chain, either "affine"
+            for 3x4 affine matrices, which skips all work on the constant bottom row
+            of the homogeneous matrices, or "homogeneous" for 4x4 matrices. Link
+            matrices are returned as 4x4 homogeneous matrices in either case.
+            (Default value = "affine")
 
         """
+        if chain_composition not in ["scan", "sequential"]:
+            raise Exception(
+                "Invalid chain_composition {}, must be one of: scan, sequential".format(
+                    chain_composition
+                )
+            )
+        self._chain_composition = chain_composition
+        if chain_representation not in ["affine", "homogeneous"]:
+            raise Exception(
+                "Invalid chain_representation {}, must be one of: affine, "
+                "homogeneous".format(chain_representation)
+            )
+        self._chain_representation = chain_representation
+        self._fk_cache_size = fk_cache_size
+        self._fk_cache = OrderedDict()
         self._num_joints = a_s.shape[-1]
-        # ToDo: incorporate the base_inv_ext_mat more elegantly, instead of the hack
-        #  as in the sample_links method
+
+        # All constants are kept as host values, and converted lazily to native
+        # arrays per backend, device and dtype.
+        self._constants = ConstantCache()
+
+        # names of the link sampling weights registered as constants, least recently
+        # used first, which are unregistered beyond LINK_SAMPLING_WEIGHTS_CACHE_SIZE
+        self._link_sampling_weight_names = OrderedDict()
+
+        # applied to the link frames when sampling links, which are otherwise
+        # expressed relative to the base frame
+
+        # 3 x 4
         if base_inv_ext_mat is None:
-            self._base_inv_ext_mat = aikit.eye(4)
+            self._constants.register("base_inv_ext_mat", aikit.to_list(aikit.eye(3, 4)))
         else:
-            self._base_inv_ext_mat = base_inv_ext_mat
+            self._constants.register(
+                "base_inv_ext_mat", aikit.to_list(base_inv_ext_mat[..., 0:3, :])
+            )
 
         # NJ
-        self._dis = d_s
-        self._dh_joint_scales = dh_joint_scales
-        self._dh_joint_offsets = dh_joint_offsets
+        self._constants.register("dh_joint_scales", dh_joint_scales)
+        self._constants.register("dh_joint_offsets", dh_joint_offsets)
 
-        # Forward Kinematics Constant Matrices
+        # Forward Kinematics Constants
 
         # Based on Denavit-Hartenberg Convention Using same nomenclature as in:
         # Modelling, Planning and Control. Bruno Siciliano, Lorenzo Sciavicco,
         # Luigi Villani, Giuseppe Oriolo page 61 - 65
 
-        AidashtoAis_list = [aikit.eye(4, batch_shape=[1])]
+        # NJ
+        a_list = aikit.to_list(a_s)
+        d_list = aikit.to_list(d_s)
+        alpha_list = aikit.to_list(alpha_s)
+        self._constants.register("a_s", a_list)
+        self._constants.register("d_s", d_list)
+        self._constants.register("cos_alphas", [math.cos(a) for a in alpha_list])
+        self._constants.register("sin_alphas", [math.sin(a) for a in alpha_list])
+
+        # R x 4
+        if chain_representation == "affine":
+            self._constants.register("identity", aikit.to_list(aikit.eye(3, 4)))
+        else:
+            self._constants.register("identity", aikit.to_list(aikit.eye(4)))
 
-        # repeated blocks
+        # Specialised Forward Kinematics Plan
 
-        # 1 x 1 x 3
-        start_of_top_row = aikit.array([[[1.0, 0.0, 0.0]]])
+        self._specialise_fk = specialise_fk
+        if specialise_fk:
+            self._build_joint_matrix_plan(a_list, d_list, alpha_list)
 
-        # 1 x 1 x 1
-        zeros = aikit.zeros((1, 1, 1))
+        # link lengths
 
-        # 1 x 1 x 4
-        bottom_row = aikit.array([[[0.0, 0.0, 0.0, 1.0]]])
+        # NJ
+        self._link_lengths = [(a**2 + d**2) ** 0.5 for a, d in zip(a_list, d_list)]
+        self._constants.register("link_lengths", self._link_lengths)
 
-        for i in range(self._num_joints):
-            # 1 x 1 x 1
-            a_i = aikit.reshape(a_s[i], [1] * 3)
-            cos_alpha = aikit.reshape(aikit.cos(alpha_s[i]), [1] * 3)
-            sin_alpha = aikit.reshape(aikit.sin(alpha_s[i]), [1] * 3)
+        # link collision geometry, as capsules around the links, until set with
+        # set_link_radii
 
-            # 1 x 1 x 4
-            top_row = aikit.concat((start_of_top_row, a_i), axis=-1)
-            top_middle_row = aikit.concat((zeros, cos_alpha, -sin_alpha, zeros), axis=-1)
-            bottom_middle_row = aikit.concat(
-                (zeros, sin_alpha, cos_alpha, zeros), axis=-1
-            )
+        # NJ x NJ x 1, the joints moving each link, as used by the jacobians
+        self._constants.register(
+            "jacobian_mask",
+            [
+                [[1.0] if j < link_num else [0.0] for j in range(self._num_joints)]
+                for link_num in range(1, self._num_joints + 1)
+            ],
+        )
+
+        # NJ
+        self._constants.register(
+            "link_radii", [LINK_RADIUS_RATIO * length for length in self._link_lengths]
+        )
 
-            # 1 x 4 x 4
-            AidashtoAi = aikit.concat(
-                (top_row, top_middle_row, bottom_middle_row, bottom_row), axis=1
+        # pairs of link numbers checked for self-collisions by default, excluding
+        # pairs of links which are adjacent, or only separated by links of zero length
+        self._self_collision_pairs = [
+            (i, j)
+            for i in range(1, self._num_joints + 1)
+            for j in range(i + 2, self._num_joints + 1)
+            if sum(self._link_lengths[i : j - 1]) > MIN_DENOMINATOR
+        ]
+
+    # Private Methods #
+    # ----------------#
+
+    def _constant(self, name, like):
+        # constant array matching the dtype and device of the array like
+        return self._constants.get(name, like.dtype, aikit.dev(like))
+
+    def _compute_joint_matrices(self, dh_joint_angles, link_num):
+        # Homogeneous transformations A_{i-1}^{i} between consecutive links, built for
+        # all joints at once from the closed form product of the joint rotation and
+        # the constant Denavit-Hartenberg link transformation.
+
+        # BS x LN
+        cos_thetas = aikit.cos(dh_joint_angles)
+        sin_thetas = aikit.sin(dh_joint_angles)
+        zeros = aikit.zeros_like(cos_thetas)
+        ones = aikit.ones_like(cos_thetas)
+
+        # LN
+        a_s = self._constant("a_s", dh_joint_angles)[0:link_num]
+        d_s = self._constant("d_s", dh_joint_angles)[0:link_num]
+        cos_alphas = self._constant("cos_alphas", dh_joint_angles)[0:link_num]
+        sin_alphas = self._constant("sin_alphas", dh_joint_angles)[0:link_num]
+
+        # BS x LN x 4
+        top_row = aikit.stack(
+            (
+                cos_thetas,
+                -sin_thetas * cos_alphas,
+                sin_thetas * sin_alphas,
+                a_s * cos_thetas,
+            ),
+            axis=-1,
+        )
+        top_middle_row = aikit.stack(
+            (
+                sin_thetas,
+                cos_thetas * cos_alphas,
+                -cos_thetas * sin_alphas,
+                a_s * sin_thetas,
+            ),
+            axis=-1,
+        )
+        bottom_middle_row = aikit.stack(
+            (zeros, zeros + sin_alphas, zeros + cos_alphas, zeros + d_s), axis=-1
+        )
+        rows = [top_row, top_middle_row, bottom_middle_row]
+        if self._chain_representation == "homogeneous":
+            rows.append(aikit.stack((zeros, zeros, zeros, ones), axis=-1))
+
+        # BS x LN x R x 4
+        return aikit.stack(rows, axis=-2)
+
+    def _build_joint_matrix_plan(self, a_list, d_list, alpha_list):
+        # With the alpha parameters snapped to exact 0 and ±1 values, every entry of
+        # the top two rows of A_{i-1}^{i} is either zero, ±cos(theta), ±sin(theta),
+        # or a*cos(theta) and a*sin(theta) for links with a non-zero offset a. The top
+        # rows of all joints are then gathered at once from a per-joint table of these
+        # terms, folding the zero and unit parameters of each joint separately. The
+        # bottom two rows are constant.
+        cos_alphas = _snap_to_unit([math.cos(a) for a in alpha_list])
+        sin_alphas = _snap_to_unit([math.sin(a) for a in alpha_list])
+        if any(v not in (-1.0, 0.0, 1.0) for v in cos_alphas + sin_alphas):
+            # other link twists need a per-joint multiply for every entry, as in the
+            # generic evaluator
+            self._specialise_fk = False
+            return
+
+        # terms in the table of each joint
+        self._joint_matrix_offsets = any(a != 0.0 for a in a_list)
+        terms = ["zero", "cos", "sin", "-cos", "-sin"]
+        if self._joint_matrix_offsets:
+            terms += ["a_cos", "a_sin"]
+
+        def _term(source, coeff):
+            if coeff == 0:
+                return "zero"
+            return source if coeff > 0 else "-" + source
+
+        # NJx8, the index of each top row entry in the flattened NJxK term table
+        term_ids = list()
+        for j, (ca, sa, a) in enumerate(zip(cos_alphas, sin_alphas, a_list)):
+            offset_cos, offset_sin = ("a_cos", "a_sin") if a != 0.0 else ("zero",) * 2
+            entries = (
+                _term("cos", 1),
+                _term("sin", -ca),
+                _term("sin", sa),
+                offset_cos,
+                _term("sin", 1),
+                _term("cos", ca),
+                _term("cos", -sa),
+                offset_sin,
             )
+            term_ids += [j * len(terms) + terms.index(entry) for entry in entries]
+        self._constants.register("joint_matrix_term_ids", term_ids)
+
+        # NJ x R-2 x 4
+        bottom_rows = [
+            [[0.0, sa, ca, d], [0.0, 0.0, 0.0, 1.0]]
+            for sa, ca, d in zip(sin_alphas, cos_alphas, d_list)
+        ]
+        if self._chain_representation == "affine":
+            bottom_rows = [rows[0:1] for rows in bottom_rows]
+        self._constants.register("joint_matrix_bottom_rows", bottom_rows)
+
+    def _compute_joint_matrices_specialised(self, dh_joint_angles, link_num):
+        # BS x LN
+        cos_thetas = aikit.cos(dh_joint_angles)
+        sin_thetas = aikit.sin(dh_joint_angles)
+        batch_shape = list(dh_joint_angles.shape[:-1])
+
+        terms = [
+            aikit.zeros_like(cos_thetas),
+            cos_thetas,
+            sin_thetas,
+            -cos_thetas,
+            -sin_thetas,
+        ]
+        if self._joint_matrix_offsets:
+            # LN
+            a_s = self._constant("a_s", dh_joint_angles)[0:link_num]
+            terms += [a_s * cos_thetas, a_s * sin_thetas]
+
+        # BS x LNxK
+        terms = aikit.reshape(aikit.stack(terms, axis=-1), batch_shape + [-1])
+
+        # LNx8
+        term_ids = self._constants.get(
+            "joint_matrix_term_ids", "int64", aikit.dev(dh_joint_angles)
+        )[0 : link_num * 8]
+
+        # BS x LN x 2 x 4
+        top_rows = aikit.reshape(
+            aikit.gather(terms, term_ids, axis=-1), batch_shape + [link_num, 2, 4]
+        )
 
-            # list
-            AidashtoAis_list.append(AidashtoAi)
+        # LN x R-2 x 4
+        bottom_rows = self._constant("joint_matrix_bottom_rows", dh_joint_angles)[
+            0:link_num
+        ]
 
-        # NJ x 4 x 4
-        self._AidashtoAis = aikit.concat(AidashtoAis_list, axis=0)
+        # BS x LN x R-2 x 4
+        bottom_rows = aikit.broadcast_to(
+            bottom_rows, batch_shape + list(bottom_rows.shape)
+        )
 
-        # Constant Jacobian Params
+        # BS x LN x R x 4
+        return aikit.concat((top_rows, bottom_rows), axis=-2)
+
+    def _link_sampling_weights(self, link_num, samples_per_metre, like):
+        # Interpolation weights mapping the LN+1 link positions to the uniformly
+        # distributed link samples. The layout only depends on the link lengths, so
+        # it is computed once per link_num and samples_per_metre, and cached for the
+        # most recently used layouts.
+        name = ("link_sampling_weights", link_num, samples_per_metre)
+        if name in self._link_sampling_weight_names:
+            self._link_sampling_weight_names.move_to_end(name)
+            return self._constant(name, like)
+
+        # LN, computed in single precision as the link lengths previously were
+        segment_sizes = aikit.to_list(
+            aikit.astype(
+                aikit.ceil(
+                    aikit.array(self._link_lengths[0:link_num], dtype="float32")
+                    * samples_per_metre
+                ),
+                "int32",
+            )
+        )
 
-        # Using same nomenclature as in:
-        # Modelling, Planning and Control. Bruno Siciliano, Lorenzo Sciavicco,
-        # Luigi Villani, Giuseppe Oriolo
-        # page 111 - 113
+        rows = list()
+        for link_idx, segment_size in enumerate(segment_sizes):
+            if segment_size == 1:
+                fractions = [0.0]
+            else:
+                fractions = [i / (segment_size - 1) for i in range(segment_size)]
+                if link_idx != link_num - 1:
+                    # the segment end is the start of the next segment
+                    fractions = fractions[:-1]
+            for fraction in fractions:
+                row = [0.0] * (link_num + 1)
+                row[link_idx] = 1.0 - fraction
+                row[link_idx + 1] = fraction
+                rows.append(row)
+
+        # total_robot_chain_length x LN+1
+        self._constants.register(name, rows)
+        self._link_sampling_weight_names[name] = None
+        if len(self._link_sampling_weight_names) > LINK_SAMPLING_WEIGHTS_CACHE_SIZE:
+            self._constants.unregister(
+                self._link_sampling_weight_names.popitem(last=False)[0]
+            )
+        return self._constant(name, like)
 
-        # 1 x 3
-        self._z0 = aikit.array([[0], [0], [1]])
+    def _world_link_positions(self, link_matrices):
+        # The base transform is affine, and so commutes with the linear interpolation
+        # between link positions. It is therefore applied to the LN+1 link frames,
+        # rather than to every sampled point.
 
-        # 1 x 4
-        self._p0hat = aikit.array([[0], [0], [0], [1]])
+        # 3 x 4
+        base_inv_ext_mat = self._constant("base_inv_ext_mat", link_matrices)
 
-        # link lengths
+        # BS x LN+1 x 3
+        return (
+            aikit.matmul(base_inv_ext_mat[:, 0:3], link_matrices[..., 0:3, 3:])[..., 0]
+            + base_inv_ext_mat[:, 3]
+        )
 
-        # NJ
-        self._link_lengths = (a_s**2 + d_s**2) ** 0.5
+    def _sample_links(self, link_matrices, link_num, samples_per_metre):
+        # BS x LN+1 x 3
+        link_positions = self._world_link_positions(link_matrices)
+
+        # total_robot_chain_length x LN+1
+        interpolation_weights = self._link_sampling_weights(
+            link_num, samples_per_metre, link_positions
+        )
+
+        # BS x total_robot_chain_length x 3
+        return aikit.matmul(interpolation_weights, link_positions)
 
     # Public Manipulator Kinematics Functions #
 
@@ -119,148 +904,694 @@ class Manipulator:
 
     # Link poses #
 
-    def compute_link_matrices(self, joint_angles, link_num, batch_shape=None):
-        """Compute homogeneous transformation matrices relative to base frame,
-        up to link_num of links.
+    def compute_forward_kinematics(self, joint_angles, batch_shape=None):
+        """Compute forward kinematics for all links, returning a result from which
+        link matrices, poses and link samples can be served for any link number
+        without recomputing the kinematic chain.
 
         Parameters
         ----------
         joint_angles
             Joint angles of the robot *[batch_shape,num_joints]*
-        link_num
-            Link number for which to compute matrices up to
         batch_shape
             Shape of batch. Inferred from inputs if None. (Default value = None)
 
         Returns
         -------
         ret
-            The link_num matrices, up the link_num *[batch_shape,link_num,4,4]*
+            The forward kinematics result, see :class:`ForwardKinematics`.
 
         """
         if batch_shape is None:
             batch_shape = joint_angles.shape[:-1]
         batch_shape = list(batch_shape)
-        num_batch_dims = len(batch_shape)
 
-        # BS x 1 x NJ
-        try:
-            dh_joint_angles = aikit.expand_dims(
-                joint_angles * self._dh_joint_scales - self._dh_joint_offsets, axis=-2
+        key = id(joint_angles)
+        if key in self._fk_cache:
+            cached_joint_angles, fk = self._fk_cache[key]
+            if cached_joint_angles is joint_angles and fk.batch_shape == batch_shape:
+                self._fk_cache.move_to_end(key)
+                return fk
+
+        # NJ
+        dh_joint_scales = self._constant("dh_joint_scales", joint_angles)
+        dh_joint_offsets = self._constant("dh_joint_offsets", joint_angles)
+
+        # BS x NJ
+        dh_joint_angles = joint_angles * dh_joint_scales - dh_joint_offsets
+
+        # BS x NJ x R x 4, with R = 3 rows for the affine chain representation
+        if self._specialise_fk:
+            Aiip1s = self._compute_joint_matrices_specialised(
+                dh_joint_angles, self._num_joints
             )
-        except Exception:
-            pass
+        else:
+            Aiip1s = self._compute_joint_matrices(dh_joint_angles, self._num_joints)
 
-        # BS x 1 x 4 x 4
-        A00 = aikit.eye(4, batch_shape=batch_shape + [1])
+        if self._chain_representation == "affine":
+            compose = _compose_affine
+        else:
+            compose = aikit.matmul
+
+        # BS x 1 x R x 4
+        identity = self._constant("identity", Aiip1s)
+        A00 = aikit.broadcast_to(identity, batch_shape + [1] + list(identity.shape))
+
+        if self._chain_composition == "scan":
+            # BS x NJ+1 x R x 4
+            A0is = aikit.concat((A00, _cumulative_matmul(Aiip1s, compose)), axis=-3)
+        else:
+            A0is = [A00]
+            for i in range(self._num_joints):
+                # BS x 1 x R x 4
+                A0is.append(compose(A0is[-1], Aiip1s[..., i : i + 1, :, :]))
+
+            # BS x NJ+1 x R x 4
+            A0is = aikit.concat(A0is, axis=-3)
+
+        fk = ForwardKinematics(self, A0is, batch_shape)
+        if self._fk_cache_size > 0:
+            # the joint angles are kept referenced, so their id cannot be reused
+            self._fk_cache[key] = (joint_angles, fk)
+            if len(self._fk_cache) > self._fk_cache_size:
+                self._fk_cache.popitem(last=False)
+        return fk
+
+    def clear_fk_cache(self):
+        """Clear all cached forward kinematics results."""
+        self._fk_cache.clear()
+
+    def compute_link_matrices(self, joint_angles, link_num, batch_shape=None):
+        """Compute homogeneous transformation matrices relative to base frame,
+        up to link_num of links.
 
-        Aitoip1dashs = list()
-        Aiip1s = list()
-        A0is = [A00]
+        Parameters
+        ----------
+        joint_angles
+            Joint angles of the robot *[batch_shape,num_joints]*
+        link_num
+            Link number for which to compute matrices up to
+        batch_shape
+            Shape of batch. Inferred from inputs if None. (Default value = None)
 
-        # repeated blocks
+        Returns
+        -------
+        ret
+            The link_num matrices, up the link_num *[batch_shape,link_num,4,4]*
 
-        # BS x 1 x NJ
-        dis = aikit.tile(
-            aikit.reshape(self._dis, [1] * num_batch_dims + [1, self._num_joints]),
-            batch_shape + [1, 1],
+        """
+        return self.compute_forward_kinematics(joint_angles, batch_shape).link_matrices(
+            link_num
         )
 
-        # BS x 1 x 4
-        bottom_row = aikit.tile(
-            aikit.reshape(aikit.array([0.0, 0.0, 0.0, 1.0]), [1] * num_batch_dims + [1, 4]),
-            batch_shape + [1, 1],
+    def compute_link_poses(
+        self, joint_angles, link_num, batch_shape=None, rotation_format="rot_vec"
+    ):
+        """Compute poses for link_num of links, starting from link 0.
+
+        Parameters
+        ----------
+        joint_angles
+            Joint angles of the robot *[batch_shape,num_joints]*
+        link_num
+            Link number for which to compute poses up to
+        batch_shape
+            Shape of batch. Inferred from inputs if None. (Default value = None)
+        rotation_format
+            Format of the pose rotations, either "rot_vec" for rotation vectors, or
+            "quaternion" for unit quaternions. (Default value = "rot_vec")
+
+        Returns
+        -------
+        ret
+            The link_num poses, up the link_num *[batch_shape,link_num,6]* for
+            rotation vectors, or *[batch_shape,link_num,7]* for quaternions.
+
+        """
+        return self.compute_forward_kinematics(joint_angles, batch_shape).link_poses(
+            link_num, rotation_format
         )
 
-        # BS x 1 x 3
-        start_of_bottom_middle = aikit.tile(
-            aikit.reshape(aikit.array([0.0, 0.0, 1.0]), [1] * num_batch_dims + [1, 3]),
-            batch_shape + [1, 1],
+    # Jacobians #
+
+    def compute_jacobian(
+        self, joint_angles, link_num=None, all_links=False, batch_shape=None
+    ):
+        """Compute the geometric jacobian of the given link relative to base frame,
+        reusing the forward kinematics chain for all batch elements at once.
+
+        Parameters
+        ----------
+        joint_angles
+            Joint angles of the robot *[batch_shape,num_joints]*
+        link_num
+            Link number for which to compute the jacobian. Default is the last link.
+        all_links
+            Whether to return the jacobians of every link up to link_num, instead of
+            only link_num. (Default value = False)
+        batch_shape
+            Shape of batch. Inferred from inputs if None. (Default value = None)
+
+        Returns
+        -------
+        ret
+            The geometric jacobian, with linear velocity rows followed by angular
+            velocity rows, *[batch_shape,6,num_joints]*, or
+            *[batch_shape,link_num,6,num_joints]* if all_links is True.
+
+        """
+        return self.compute_forward_kinematics(joint_angles, batch_shape).jacobian(
+            link_num, all_links
         )
 
-        # BS x 1 x 2
-        zeros = aikit.zeros(batch_shape + [1, 2])
+    def compute_manipulability_metrics(
+        self,
+        joint_angles,
+        link_num=None,
+        translational_only=False,
+        singularity_threshold=1e-3,
+        batch_shape=None,
+    ):
+        """Compute manipulability and singularity metrics of the given link for all
+        batch elements at once, such as every sample of a batch of trajectories,
+        from a single forward kinematics and jacobian pass.
+
+        Parameters
+        ----------
+        joint_angles
+            Joint angles of the robot *[batch_shape,num_joints]*
+        link_num
+            Link number for which to compute the metrics. Default is the last link.
+        translational_only
+            Whether to only consider the linear velocity rows of the jacobian.
+            (Default value = False)
+        singularity_threshold
+            Minimum singular value below which a configuration is considered
+            singular. (Default value = 1e-3)
+        batch_shape
+            Shape of batch. Inferred from inputs if None. (Default value = None)
+
+        Returns
+        -------
+        ret
+            The Yoshikawa manipulability, as the product of the singular values
+            *[batch_shape]*, the minimum singular value *[batch_shape]*, the
+            condition number *[batch_shape]*, and the singularity mask
+            *[batch_shape]*
 
-        for i in range(self._num_joints):
-            # BS x 1 x 4
-            top_row = aikit.concat(
+        """
+        return self.compute_forward_kinematics(
+            joint_angles, batch_shape
+        ).manipulability_metrics(link_num, translational_only, singularity_threshold)
+
+    # Inverse kinematics #
+
+    def solve_inverse_kinematics(
+        self,
+        target_matrices,
+        link_num=None,
+        num_seeds=8,
+        initial_joint_angles=None,
+        max_iterations=100,
+        tolerance=1e-4,
+        damping=1e-2,
+        step_size=1.0,
+        orientation_weight=1.0,
+        seed=None,
+    ):
+        """Solve inverse kinematics for a batch of target link poses, with damped
+        least squares (Levenberg-Marquardt) steps using the analytic geometric
+        jacobian. Every target is solved from several random seeds in parallel.
+        Elements which have converged are removed from the working set, so they
+        stop costing work, and the best solution over the seeds is returned for
+        each target.
+
+        Parameters
+        ----------
+        target_matrices
+            Target homogeneous transformation matrices of the link, relative to
+            base frame *[batch_shape,3,4]* or *[batch_shape,4,4]*
+        link_num
+            Link number to place at the targets. Default is the last link.
+        num_seeds
+            Number of joint angle seeds to solve from per target. (Default value = 8)
+        initial_joint_angles
+            Joint angles to use as the first seed for each target
+            *[batch_shape,num_joints]*. All seeds are random if None.
+            (Default value = None)
+        max_iterations
+            Maximum number of damped least squares steps. (Default value = 100)
+        tolerance
+            Pose error norm below which an element has converged.
+            (Default value = 1e-4)
+        damping
+            Damping factor of the least squares steps. (Default value = 1e-2)
+        step_size
+            Scale applied to each step. (Default value = 1.0)
+        orientation_weight
+            Weight of the orientation error relative to the position error.
+            (Default value = 1.0)
+        seed
+            Random seed for the joint angle seeds. (Default value = None)
+
+        Returns
+        -------
+        ret
+            The best joint angles found per target *[batch_shape,num_joints]*, their
+            pose error norms *[batch_shape]* and whether they converged
+            *[batch_shape]*
+
+        """
+        link_num = self._num_joints if link_num is None else link_num
+        batch_shape = list(target_matrices.shape[:-2])
+        num_joints = self._num_joints
+
+        # BS x S x NJ
+        seeds = aikit.random_uniform(
+            low=-math.pi,
+            high=math.pi,
+            shape=batch_shape + [num_seeds, num_joints],
+            dtype=target_matrices.dtype,
+            device=aikit.dev(target_matrices),
+            seed=seed,
+        )
+        if initial_joint_angles is not None:
+            seeds = aikit.concat(
                 (
-                    aikit.cos(dh_joint_angles[..., i : i + 1]),
-                    -aikit.sin(dh_joint_angles[..., i : i + 1]),
-                    zeros,
+                    aikit.expand_dims(
+                        aikit.astype(initial_joint_angles, seeds.dtype), axis=-2
+                    ),
+                    seeds[..., 1:, :],
                 ),
-                axis=-1,
+                axis=-2,
             )
-            top_middle_row = aikit.concat(
-                (
-                    aikit.sin(dh_joint_angles[..., i : i + 1]),
-                    aikit.cos(dh_joint_angles[..., i : i + 1]),
-                    zeros,
-                ),
-                axis=-1,
+
+        # M x NJ, working set of all active elements
+        joint_angles = aikit.reshape(seeds, (-1, num_joints))
+
+        # M
+        element_ids = aikit.arange(
+            joint_angles.shape[0], dtype="int64", device=aikit.dev(seeds)
+        )
+
+        # M x 3 x 4
+        targets = aikit.reshape(
+            aikit.expand_dims(target_matrices[..., 0:3, :], axis=-3)
+            + aikit.zeros(
+                batch_shape + [num_seeds, 3, 4],
+                dtype=seeds.dtype,
+                device=aikit.dev(seeds),
+            ),
+            (-1, 3, 4),
+        )
+
+        # 6 x 1
+        row_weights = aikit.array(
+            [[1.0], [1.0], [1.0]] + [[orientation_weight]] * 3,
+            dtype=seeds.dtype,
+            device=aikit.dev(seeds),
+        )
+
+        # 6 x 6
+        damping_matrix = damping**2 * aikit.eye(
+            6, dtype=seeds.dtype, device=aikit.dev(seeds)
+        )
+
+        # list of finished element ids, joint angles and error norms
+        finished = list()
+
+        for iteration in range(max_iterations + 1):
+            fk = self.compute_forward_kinematics(joint_angles)
+
+            # A x NJ+1 x 3 x 4
+            link_matrices = fk.link_affine_matrices()
+
+            # A x 6
+            errors = _pose_error(
+                link_matrices[..., link_num, :, :], targets, orientation_weight
             )
-            bottom_middle_row = aikit.concat(
-                (start_of_bottom_middle, dis[..., i : i + 1]), axis=-1
+
+            # A
+            error_norms = aikit.vector_norm(errors, axis=-1)
+            if iteration == max_iterations:
+                done = aikit.ones_like(error_norms, dtype="bool")
+            else:
+                done = error_norms <= tolerance
+
+            # D,    K
+            done_ids = aikit.nonzero(done)[0]
+            keep_ids = aikit.nonzero(aikit.logical_not(done))[0]
+
+            if done_ids.shape[0] > 0:
+                finished.append(
+                    tuple(
+                        aikit.gather(x, done_ids, axis=0)
+                        for x in (element_ids, joint_angles, error_norms)
+                    )
+                )
+                if keep_ids.shape[0] == 0:
+                    break
+
+                # K x ..., the jacobian is only computed for the remaining elements
+                element_ids, joint_angles, targets, errors, link_matrices = (
+                    aikit.gather(x, keep_ids, axis=0)
+                    for x in (element_ids, joint_angles, targets, errors, link_matrices)
+                )
+                fk = ForwardKinematics(self, link_matrices, [keep_ids.shape[0]])
+
+            # A x 6 x NJ
+            jacobians = fk.jacobian(link_num) * row_weights
+
+            # A x NJ x 6
+            jacobians_trans = aikit.swapaxes(jacobians, -1, -2)
+
+            # A x 6 x 6
+            damped = aikit.matmul(jacobians, jacobians_trans) + damping_matrix
+
+            # A x NJ
+            steps = aikit.matmul(
+                jacobians_trans, aikit.solve(damped, aikit.expand_dims(errors, -1))
+            )[..., 0]
+            joint_angles = joint_angles + step_size * steps
+
+        # M, restoring the original element order
+        order = aikit.argsort(aikit.concat([f[0] for f in finished], axis=0))
+
+        # BS x S x NJ
+        all_joint_angles = aikit.reshape(
+            aikit.gather(aikit.concat([f[1] for f in finished], axis=0), order, axis=0),
+            batch_shape + [num_seeds, num_joints],
+        )
+
+        # BS x S
+        all_error_norms = aikit.reshape(
+            aikit.gather(aikit.concat([f[2] for f in finished], axis=0), order, axis=0),
+            batch_shape + [num_seeds],
+        )
+
+        # BS x S
+        best_seeds = aikit.one_hot(
+            aikit.argmin(all_error_norms, axis=-1),
+            num_seeds,
+            dtype=all_error_norms.dtype,
+        )
+
+        # BS x NJ
+        best_joint_angles = aikit.sum(
+            all_joint_angles * aikit.expand_dims(best_seeds, axis=-1), axis=-2
+        )
+
+        # BS
+        best_error_norms = aikit.min(all_error_norms, axis=-1)
+        return best_joint_angles, best_error_norms, best_error_norms <= tolerance
+
+    # Dynamics #
+
+    def set_inertial_params(self, link_masses, link_coms, link_inertias):
+        """Attach the inertial parameters of the links, required for computing the
+        dynamics of the manipulator.
+
+        Parameters
+        ----------
+        link_masses
+            Masses of the links *[num_joints]*
+        link_coms
+            Centres of mass of the links, in the link frames *[num_joints,3]*
+        link_inertias
+            Inertia tensors of the links about their centres of mass, in the link
+            frames *[num_joints,3,3]*
+
+        """
+        self._constants.register("link_masses", link_masses)
+        self._constants.register("link_coms", link_coms)
+        self._constants.register("link_inertias", link_inertias)
+
+    def compute_inverse_dynamics(
+        self,
+        joint_angles,
+        joint_velocities,
+        joint_accelerations,
+        gravity=None,
+        batch_shape=None,
+    ):
+        """Compute the joint torques required for the given joint accelerations, with
+        the recursive Newton-Euler algorithm, reusing the forward kinematics chain.
+        Both recursions are expressed in the base frame, where the forward
+        propagation of velocities and accelerations and the backward propagation of
+        forces and moments along the chain reduce to cumulative sums over the joints,
+        so all batch elements and joints are computed at once.
+
+        Parameters
+        ----------
+        joint_angles
+            Joint angles of the robot *[batch_shape,num_joints]*
+        joint_velocities
+            Joint velocities of the robot *[batch_shape,num_joints]*
+        joint_accelerations
+            Joint accelerations of the robot *[batch_shape,num_joints]*
+        gravity
+            Gravitational acceleration in the base frame *[3]*. Default is 9.81 along
+            the negative z axis.
+        batch_shape
+            Shape of batch. Inferred from inputs if None. (Default value = None)
+
+        Returns
+        -------
+        ret
+            The joint torques *[batch_shape,num_joints]*
+
+        """
+        if "link_masses" not in self._constants:
+            raise Exception(
+                "inertial parameters must be set with set_inertial_params before "
+                "computing the dynamics"
             )
+        if gravity is None:
+            gravity = [0.0, 0.0, -9.81]
+
+        # BS x NJ+1 x 3 x 4
+        mats = self.compute_forward_kinematics(
+            joint_angles, batch_shape
+        ).link_affine_matrices()
+
+        # BS x NJ x 3, joint axes z_{i-1} and origins p_{i-1}, and link origins p_i
+        joint_axes = mats[..., :-1, :, 2]
+        joint_origins = mats[..., :-1, :, 3]
+        link_origins = mats[..., 1:, :, 3]
+
+        # BS x NJ x 3 x 3
+        link_rotations = mats[..., 1:, :, 0:3]
+
+        # NJ, chain rule through the Denavit-Hartenberg joint scales
+        scales = self._constant("dh_joint_scales", link_origins)
+
+        # BS x NJ x 1
+        joint_velocities = aikit.expand_dims(joint_velocities * scales, axis=-1)
+        joint_accelerations = aikit.expand_dims(joint_accelerations * scales, axis=-1)
+
+        # forward recursion
+
+        # BS x NJ x 3
+        angular_velocities = aikit.cumsum(joint_axes * joint_velocities, axis=-2)
+        prev_angular_velocities = aikit.concat(
+            (
+                aikit.zeros_like(angular_velocities[..., 0:1, :]),
+                angular_velocities[..., :-1, :],
+            ),
+            axis=-2,
+        )
+        angular_accelerations = aikit.cumsum(
+            joint_axes * joint_accelerations
+            + aikit.cross(prev_angular_velocities, joint_axes * joint_velocities),
+            axis=-2,
+        )
 
-            # BS x 4 x 4
-            Aitoip1dash = aikit.concat(
-                (top_row, top_middle_row, bottom_middle_row, bottom_row), axis=-2
+        # BS x NJ x 3, with gravity included as an acceleration of the base
+        link_offsets = link_origins - joint_origins
+        origin_accelerations = aikit.cumsum(
+            aikit.cross(angular_accelerations, link_offsets)
+            + aikit.cross(
+                angular_velocities, aikit.cross(angular_velocities, link_offsets)
+            ),
+            axis=-2,
+        ) - aikit.array(gravity, dtype=link_origins.dtype, device=aikit.dev(mats))
+
+        # BS x NJ x 3
+        com_offsets = aikit.matmul(
+            link_rotations,
+            aikit.expand_dims(self._constant("link_coms", link_origins), axis=-1),
+        )[..., 0]
+        com_positions = link_origins + com_offsets
+        com_accelerations = (
+            origin_accelerations
+            + aikit.cross(angular_accelerations, com_offsets)
+            + aikit.cross(
+                angular_velocities, aikit.cross(angular_velocities, com_offsets)
             )
+        )
+
+        # BS x NJ x 3 x 3
+        inertias = aikit.matmul(
+            aikit.matmul(link_rotations, self._constant("link_inertias", link_origins)),
+            aikit.swapaxes(link_rotations, -1, -2),
+        )
+
+        # BS x NJ x 3, inertial forces and moments about the centres of mass
+        forces = (
+            aikit.expand_dims(self._constant("link_masses", link_origins), axis=-1)
+            * com_accelerations
+        )
+        moments = aikit.matmul(
+            inertias, aikit.expand_dims(angular_accelerations, axis=-1)
+        )[..., 0] + aikit.cross(
+            angular_velocities,
+            aikit.matmul(inertias, aikit.expand_dims(angular_velocities, axis=-1))[
+                ..., 0
+            ],
+        )
 
-            # (BSx4) x 4
-            Aitoip1dash_flat = aikit.reshape(Aitoip1dash, (-1, 4))
+        # backward recursion
 
-            # (BSx4) x 4
-            Aiip1_flat = aikit.matmul(Aitoip1dash_flat, self._AidashtoAis[i + 1])
+        # BS x NJ x 3, moments about the base origin, shifted to the joint origins
+        link_forces = _reverse_cumsum(forces, axis=-2)
+        link_moments = _reverse_cumsum(
+            moments + aikit.cross(com_positions, forces), axis=-2
+        ) - aikit.cross(joint_origins, link_forces)
 
-            # BS x 4 x 4
-            Aiip1 = aikit.reshape(Aiip1_flat, batch_shape + [4, 4])
+        # BS x NJ
+        return aikit.sum(link_moments * joint_axes, axis=-1) * scales
+
+    # Collision geometry #
+
+    def set_link_radii(self, link_radii):
+        """Set the radii of the capsules around the links of the robot, used as the
+        collision geometry of the links. By default, the radii are a tenth of the
+        link lengths.
+
+        Parameters
+        ----------
+        link_radii
+            Radii of the link capsules *[num_joints]*
+
+        """
+        self._constants.register("link_radii", link_radii)
 
-            # BS x 4 x 4
-            A0ip1 = aikit.matmul(A0is[-1][..., 0, :, :], Aiip1)
+    def compute_link_capsules(self, joint_angles, link_num=None, batch_shape=None):
+        """Compute capsules around the links of the robot, in the world reference
+        frame.
 
-            # append term to lists
-            Aitoip1dashs.append(Aitoip1dash)
-            Aiip1s.append(Aiip1)
-            A0is.append(aikit.expand_dims(A0ip1, axis=-3))
+        Parameters
+        ----------
+        joint_angles
+            Joint angles of the robot *[batch_shape,num_joints]*
+        link_num
+            Link number for which to compute capsules up to. Default is the last link.
+        batch_shape
+            Shape of batch. Inferred from inputs if None. (Default value = None)
 
-            if i + 1 == link_num:
-                # BS x LN x 4 x 4
-                return aikit.concat(A0is, axis=-3)
+        Returns
+        -------
+        ret
+            The capsule start points *[batch_shape,link_num,3]*, end points
+            *[batch_shape,link_num,3]* and radii *[link_num]*
 
-        raise Exception(
-            "wrong parameter entered for link_num, please enter integer from 1-"
-            + str(self._num_joints)
+        """
+        return self.compute_forward_kinematics(joint_angles, batch_shape).link_capsules(
+            link_num
         )
 
-    def compute_link_poses(self, joint_angles, link_num, batch_shape=None):
-        """Compute rotation vector poses for link_num of links, starting from link 0.
+    def compute_link_spheres(
+        self, joint_angles, link_num=None, spheres_per_link=2, batch_shape=None
+    ):
+        """Compute spheres evenly spaced along the links of the robot, in the world
+        reference frame, which together cover the cylinder of each link capsule.
 
         Parameters
         ----------
         joint_angles
             Joint angles of the robot *[batch_shape,num_joints]*
         link_num
-            Link number for which to compute poses up to
+            Link number for which to compute spheres up to. Default is the last link.
+        spheres_per_link
+            Number of spheres along each link (Default value = 2)
         batch_shape
             Shape of batch. Inferred from inputs if None. (Default value = None)
 
         Returns
         -------
         ret
-            The link_num poses, up the link_num *[batch_shape,link_num,6]*
+            The sphere centres *[batch_shape,link_num*spheres_per_link,3]* and radii
+            *[link_num*spheres_per_link]*
 
         """
-        if batch_shape is None:
-            batch_shape = joint_angles.shape[:-1]
-        batch_shape = list(batch_shape)
+        return self.compute_forward_kinematics(joint_angles, batch_shape).link_spheres(
+            link_num, spheres_per_link
+        )
 
-        # BS x LN x 4 x 4
-        link_matrices = self.compute_link_matrices(joint_angles, link_num, batch_shape)
+    def compute_link_distances(
+        self, joint_angles, points, link_num=None, point_radii=None, batch_shape=None
+    ):
+        """Compute signed distances between query points, or spheres, and the
+        capsules around the links of the robot, at a cost linear in the number of
+        links rather than in the number of link samples.
 
-        # BS x LN x 6
-        return aikit_mech.mat_pose_to_rot_vec_pose(link_matrices[..., 0:3, :])
+        Parameters
+        ----------
+        joint_angles
+            Joint angles of the robot *[batch_shape,num_joints]*
+        points
+            Cartesian query points, in the world reference frame
+            *[batch_shape,num_points,3]*
+        link_num
+            Link number for which to compute distances up to. Default is the last
+            link.
+        point_radii
+            Radii of spheres centred at the query points *[num_points]*. The points
+            are treated as points if None. (Default value = None)
+        batch_shape
+            Shape of batch. Inferred from inputs if None. (Default value = None)
+
+        Returns
+        -------
+        ret
+            The signed distances *[batch_shape,num_points,link_num]*
+
+        """
+        return self.compute_forward_kinematics(
+            joint_angles, batch_shape
+        ).link_distances(points, link_num, point_radii)
+
+    def check_self_collisions(
+        self, joint_angles, link_pairs=None, safety_margin=0.0, batch_shape=None
+    ):
+        """Check self-collisions between pairs of link capsules for all batch elements
+        at once, such as every sample of a batch of trajectories, from the exact
+        signed distances between the capsules of all pairs.
+
+        Parameters
+        ----------
+        joint_angles
+            Joint angles of the robot *[batch_shape,num_joints]*
+        link_pairs
+            Pairs of link numbers (i, j) to check, from 1 to num_joints. Default is
+            all pairs of links which are not adjacent, or only separated by links of
+            zero length.
+        safety_margin
+            Distance between link capsules below which they are considered
+            colliding. (Default value = 0.0)
+        batch_shape
+            Shape of batch. Inferred from inputs if None. (Default value = None)
+
+        Returns
+        -------
+        ret
+            The minimum signed distance between the checked link capsules
+            *[batch_shape]*, and the collision mask *[batch_shape]*
+
+        """
+        return self.compute_forward_kinematics(
+            joint_angles, batch_shape
+        ).self_collisions(link_pairs, safety_margin)
 
     # Link sampling #
 
@@ -287,79 +1618,118 @@ class Manipulator:
             *[batch_shape,total_sampling_chain_length,3]*
 
         """
-        if link_num is None:
-            link_num = self._num_joints
-        if batch_shape is None:
-            batch_shape = joint_angles.shape[:-1]
-        batch_shape = list(batch_shape)
-        num_batch_dims = len(batch_shape)
-        batch_dims_for_trans = list(range(num_batch_dims))
+        return self.compute_forward_kinematics(joint_angles, batch_shape).sample_links(
+            link_num, samples_per_metre
+        )
 
-        # BS x NJ x 4 x 4
-        link_matrices = self.compute_link_matrices(joint_angles, link_num, batch_shape)
+    def sample_swept_links(
+        self,
+        joint_angles,
+        link_num=None,
+        samples_per_metre=25,
+        num_substeps=None,
+        batch_shape=None,
+    ):
+        """Sample the volume swept by the links of the robot between consecutive
+        configurations. Between each pair of consecutive configurations, the joint
+        angles are interpolated linearly at num_substeps+1 substeps, including both
+        configurations, and each substep is sampled as in :meth:`sample_links`,
+        with a single batched forward kinematics pass over all substeps. The
+        samples therefore follow the arcs traced by the links, rather than the
+        chords between the link positions of consecutive configurations.
 
-        # BS x LN+1 x 3
-        link_positions = link_matrices[..., 0:3, -1]
+        Parameters
+        ----------
+        joint_angles
+            Consecutive joint angles of the robot
+            *[batch_shape,num_configs,num_joints]*
+        link_num
+            Link number for which to sample links up to. Default is the last link.
+        samples_per_metre
+            Number of samples per metre of robot link (Default value = 25)
+        num_substeps
+            Number of interpolation substeps between consecutive configurations.
+            Default is the number which keeps an upper bound on the arc length
+            travelled by any link point between substeps, the rotation of each
+            joint times the chain length beyond it, within one sample spacing.
+        batch_shape
+            Shape of batch and configurations *[batch_shape,num_configs]*. Inferred
+            from inputs if None. (Default value = None)
 
-        # BS x LN x 3
-        segment_starts = link_positions[..., :-1, :]
-        segment_ends = link_positions[..., 1:, :]
+        Returns
+        -------
+        ret
+            The sampled swept cartesian positions for each pair of consecutive
+            configurations
+            *[batch_shape,num_configs-1,(num_substeps+1)*total_sampling_chain_length,3]*
 
-        # LN
-        segment_sizes = aikit.astype(
-            aikit.ceil(self._link_lengths[0:link_num] * samples_per_metre), "int32"
-        )
+        """
+        if batch_shape is None:
+            batch_shape = joint_angles.shape[:-1]
+        batch_shape = list(batch_shape)
+        link_num = self._num_joints if link_num is None else link_num
 
-        # list of segments
-        segments_list = list()
+        # BS x T-1 x 1 x NJ
+        start_angles = aikit.expand_dims(joint_angles[..., :-1, :], axis=-2)
+        angle_deltas = (
+            aikit.expand_dims(joint_angles[..., 1:, :], axis=-2) - start_angles
+        )
 
-        for link_idx in range(link_num):
-            segment_size = segment_sizes[link_idx]
+        if num_substeps is None:
+            # LN
+            reaches = _reverse_cumsum(
+                self._constant("link_lengths", joint_angles)[0:link_num], axis=-1
+            )
+            dh_joint_scales = self._constant("dh_joint_scales", joint_angles)
 
-            # BS x 1 x 3
-            segment_start = segment_starts[..., link_idx : link_idx + 1, :]
-            segment_end = segment_ends[..., link_idx : link_idx + 1, :]
+            # BS x T-1 x 1 x LN
+            arc_lengths = (
+                aikit.abs(angle_deltas[..., 0:link_num] * dh_joint_scales[0:link_num])
+                * reaches
+            )
 
-            # BS x segment_size x 3
-            segment = aikit.linspace(segment_start, segment_end, segment_size, axis=-2)[
-                ..., 0, :, :
-            ]
-            if aikit.current_backend_str() == "torch" and segment.shape[-2] == 3:
-                segment = aikit.swapaxes(segment, -2, -1)
-            if link_idx == link_num - 1 or segment_size == 1:
-                segments_list.append(segment)
-            else:
-                segments_list.append(segment[..., :-1, :])
+            max_arc_length = aikit.to_scalar(aikit.max(aikit.sum(arc_lengths, axis=-1)))
+            num_substeps = max(int(math.ceil(max_arc_length * samples_per_metre)), 1)
 
-        # BS x total_robot_chain_length x 3
-        all_segments = aikit.concat(segments_list, axis=-2)
+        # S x 1
+        fractions = aikit.array(
+            [[i / num_substeps] for i in range(num_substeps + 1)],
+            dtype=joint_angles.dtype,
+            device=aikit.dev(joint_angles),
+        )
 
-        # BS x total_robot_chain_length x 4
-        all_segments_homo = aikit_mech.make_coordinates_homogeneous(all_segments)
+        # BS x T-1 x S x NJ
+        substep_angles = start_angles + fractions * angle_deltas
 
-        # 4 x BSxtotal_robot_chain_length
-        all_segments_homo_trans = aikit.reshape(
-            aikit.permute_dims(
-                all_segments_homo,
-                axes=[num_batch_dims + 1] + batch_dims_for_trans + [num_batch_dims],
-            ),
-            (4, -1),
+        # BS x T-1 x S x LN+1 x 3
+        link_positions = self._world_link_positions(
+            self.compute_forward_kinematics(
+                substep_angles,
+                batch_shape[:-1] + [batch_shape[-1] - 1, num_substeps + 1],
+            ).link_affine_matrices(link_num)
         )
 
-        # 3 x BSxtotal_robot_chain_length
-        transformed_trans = aikit.matmul(
-            self._base_inv_ext_mat[..., 0:3, :], all_segments_homo_trans
+        # total_robot_chain_length x LN+1
+        interpolation_weights = self._link_sampling_weights(
+            link_num, samples_per_metre, link_positions
         )
 
-        # BS x total_robot_chain_length x 3
-        return aikit.permute_dims(
-            aikit.reshape(transformed_trans, [3] + batch_shape + [-1]),
-            axes=[i + 1 for i in batch_dims_for_trans] + [num_batch_dims + 1] + [0],
-        )
+        # BS x T-1 x S x total_robot_chain_length x 3
+        samples = aikit.matmul(interpolation_weights, link_positions)
+
+        # BS x T-1 x Sxtotal_robot_chain_length x 3
+        return aikit.reshape(samples, list(samples.shape[:-3]) + [-1, 3])
 
 
 class MicoManipulator(Manipulator):
-    def __init__(self, base_inv_ext_mat=None):
+    def __init__(
+        self,
+        base_inv_ext_mat=None,
+        chain_composition="scan",
+        fk_cache_size=0,
+        specialise_fk=True,
+        chain_representation="affine",
+    ):
         """Initialize Kinova Mico robot manipulator instance. Denavit–Hartenberg
         parameters inferred from KINOVA_MICO_Robotic_arm_user_guide.pdf Joint scales
         and offsets inferred from JACO²-6DOF-Advanced-Specification-Guide.pdf Both of
@@ -369,6 +1739,18 @@ class MicoManipulator(Manipulator):
         ----------
         base_inv_ext_mat
             Inverse extrinsic matrix of the robot base *[3,4]*
+        chain_composition
+            How to compose the kinematic chain, either "scan" or "sequential".
+            (Default value = "scan")
+        fk_cache_size
+            Number of forward kinematics results to cache, keyed on the identity of
+            the joint angles array. (Default value = 0)
+        specialise_fk
+            Whether to compute the joint matrices with an evaluator specialised to
+            the constant Denavit–Hartenberg structure. (Default value = True)
+        chain_representation
+            Representation in which to compose the kinematic chain, either "affine"
+            or "homogeneous". (Default value = "affine")
 
         """
         # length params
@@ -416,12 +1798,28 @@ class MicoManipulator(Manipulator):
 
         # call constructor
         super().__init__(
-            a_s, d_s, alpha_s, dh_joint_scales, dh_joint_offsets, base_inv_ext_mat
+            a_s,
+            d_s,
+            alpha_s,
+            dh_joint_scales,
+            dh_joint_offsets,
+            base_inv_ext_mat,
+            chain_composition,
+            fk_cache_size,
+            specialise_fk,
+            chain_representation,
         )
 
 
 class PandaManipulator(Manipulator):
-    def __init__(self, base_inv_ext_mat=None):
+    def __init__(
+        self,
+        base_inv_ext_mat=None,
+        chain_composition="scan",
+        fk_cache_size=0,
+        specialise_fk=True,
+        chain_representation="affine",
+    ):
         """Initialize FRANKA EMIKA Panda robot manipulator instance.
             Denavit–Hartenberg parameters inferred from FRANKA EMIKA online API.
             Screenshot included in this module for reference.
@@ -430,6 +1828,18 @@ class PandaManipulator(Manipulator):
         ----------
         base_inv_ext_mat
             Inverse extrinsic matrix of the robot base *[3,4]*
+        chain_composition
+            How to compose the kinematic chain, either "scan" or "sequential".
+            (Default value = "scan")
+        fk_cache_size
+            Number of forward kinematics results to cache, keyed on the identity of
+            the joint angles array. (Default value = 0)
+        specialise_fk
+            Whether to compute the joint matrices with an evaluator specialised to
+            the constant Denavit–Hartenberg structure. (Default value = True)
+        chain_representation
+            Representation in which to compose the kinematic chain, either "affine"
+            or "homogeneous". (Default value = "affine")
 
         """
         # dh params
@@ -453,5 +1863,14 @@ class PandaManipulator(Manipulator):
         dh_joint_offsets = aikit.zeros((7,))
 
         super().__init__(
-            a_s, d_s, alpha_s, dh_joint_scales, dh_joint_offsets, base_inv_ext_mat
+            a_s,
+            d_s,
+            alpha_s,
+            dh_joint_scales,
+            dh_joint_offsets,
+            base_inv_ext_mat,
+            chain_composition,
+            fk_cache_size,
+            specialise_fk,
+            chain_representation,
         )
@@ -5,6 +5,11 @@ planning.
 
 # global
 import aikit
+from collections import OrderedDict
+
+# local
+from aikit_robot.constant_cache import ConstantCache
+from aikit_robot.profiling import increment_counter, timed_stage
 
 
 # Helpers #
@@ -13,10 +18,7 @@ import aikit
 
 def _pairwise_distance(x, y):
     # BS x NX x 1 x 1
-    try:
-        x = aikit.expand_dims(x, axis=-2)
-    except Exception:
-        pass
+    x = aikit.expand_dims(x, axis=-2)
 
     # BS x 1 x NY x 1
     y = aikit.expand_dims(y, axis=-3)
@@ -25,6 +27,33 @@ def _pairwise_distance(x, y):
     return aikit.sum((x - y) ** 2, axis=-1)
 
 
+def _fold_batch(x):
+    # moves the batch dims of BS x N x D into the columns, giving N x (BSxD)
+    num_batch_dims = len(x.shape) - 2
+    x = aikit.permute_dims(
+        x,
+        axes=[num_batch_dims] + list(range(num_batch_dims)) + [num_batch_dims + 1],
+    )
+    return aikit.reshape(x, (x.shape[0], -1))
+
+
+def _unfold_batch(x, batch_shape):
+    # inverse of _fold_batch, N x (BSxD) to BS x N x D
+    num_batch_dims = len(batch_shape)
+    x = aikit.reshape(x, [x.shape[0]] + batch_shape + [-1])
+    return aikit.permute_dims(
+        x, axes=list(range(1, num_batch_dims + 1)) + [0, num_batch_dims + 1]
+    )
+
+
+def _solve(a, b):
+    # an unbatched system shared by batched right hand sides is factorized once,
+    # by solving for all of the batched right hand sides as extra columns
+    if len(a.shape) == 2 and len(b.shape) > 2:
+        return _unfold_batch(aikit.solve(a, _fold_batch(b)), list(b.shape[:-2]))
+    return aikit.solve(a, b)
+
+
 def _phi(r, order):
     eps = aikit.array([1e-6], dtype="float32")
     if order % 2 == 0:
@@ -35,21 +64,30 @@ def _phi(r, order):
         return r ** (0.5 * order)
 
 
-def _fit_spline(train_points, train_values, order):
+def _phi_derivatives(diffs, order):
+    # first and second derivatives of the kernel with respect to the signed
+    # difference, given as functions of the squared distance r = diffs ** 2
+    eps = aikit.array([1e-6], dtype="float32")
+    r = aikit.maximum(diffs**2, eps)
+    r_pow = r ** (0.5 * (order - 2))
+    if order % 2 == 0:
+        log_r = aikit.log(r)
+        first = diffs * r_pow * (0.5 * order * log_r + 1)
+        second = r_pow * (0.5 * order * (order - 1) * log_r + 2 * order - 1)
+    else:
+        first = order * diffs * r_pow
+        second = order * (order - 1) * r_pow
+    return first, second
+
+
+def _spline_lhs(train_points, order):
     # shapes
-    train_points_shape = train_points.shape
-    batch_shape = list(train_points_shape[:-2])
+    batch_shape = list(train_points.shape[:-2])
     num_batch_dims = len(batch_shape)
-    n = train_points_shape[-2]
-    print(train_values)
-    pd = train_values.shape[-1]
 
     # BS x N x 1
     c = train_points
 
-    # BS x N x PD
-    f_ = train_values
-
     # BS x N x N
     matrix_a = _phi(_pairwise_distance(c, c), order)
 
@@ -75,33 +113,834 @@ def _fit_spline(train_points, train_values, order):
     right_block = aikit.concat([matrix_b, lhs_zeros], axis=-2)
 
     # BS x N+2 x N+2
-    lhs = aikit.concat([left_block, right_block], axis=-1)
+    return aikit.concat([left_block, right_block], axis=-1)
 
-    # BS x 2 x PD
-    rhs_zeros = aikit.zeros(batch_shape + [2, pd])
 
-    # BS x N+2 x PD
-    rhs = aikit.concat([f_, rhs_zeros], axis=-2)
+def _fit_spline_pinv(train_points, train_values, order):
+    # shapes
+    batch_shape = list(train_values.shape[:-2])
+    n = train_points.shape[-2]
+    pd = train_values.shape[-1]
+
+    # BS x N x PD
+    f_ = train_values
+
+    with timed_stage("spline_kernel"):
+        # BS x N+2 x N+2
+        lhs = _spline_lhs(train_points, order)
 
-    # BS x N+2 x PD
-    w_v = aikit.matmul(aikit.pinv(lhs), rhs)
+    with timed_stage("spline_solve"):
+        # BS x 2 x PD
+        rhs_zeros = aikit.zeros(batch_shape + [2, pd])
+
+        # BS x N+2 x PD
+        rhs = aikit.concat([f_, rhs_zeros], axis=-2)
+
+        # BS x N+2 x PD
+        w_v = aikit.matmul(aikit.pinv(lhs), rhs)
+
+    # BS x N x PD,    BS x 2 x PD
+    return w_v[..., :n, :], w_v[..., n:, :]
+
+
+def _fit_spline_schur(train_points, train_values, order, with_residual=False):
+    # Solves the saddle-point system [[A, B], [B^T, 0]] [w; v] = [f; 0] via the
+    # Schur complement of the kernel block A, using batched LU solves rather than
+    # an SVD of the full N+2 x N+2 system.
+
+    # BS x N x 1
+    c = train_points
 
     # BS x N x PD
-    w = w_v[..., :n, :]
+    f_ = train_values
+
+    with timed_stage("spline_kernel"):
+        # BS x N x N
+        matrix_a = _phi(_pairwise_distance(c, c), order)
+
+        # BS x N x 2
+        matrix_b = aikit.concat([c, aikit.ones_like(c[..., :1])], axis=-1)
+
+        # BS x 2 x N
+        matrix_b_trans = aikit.swapaxes(matrix_b, -1, -2)
+
+    with timed_stage("spline_solve"):
+        if len(c.shape) == 2 and len(f_.shape) > 2:
+            # anchor layout shared across the batch of values, factorize only once
+
+            # N x 2+(BSxPD)
+            y_z = aikit.solve(
+                matrix_a, aikit.concat([matrix_b, _fold_batch(f_)], axis=-1)
+            )
+
+            # N x 2,    BS x N x PD
+            y = y_z[..., :2]
+            z = _unfold_batch(y_z[..., 2:], list(f_.shape[:-2]))
+        else:
+            # BS x N x 2+PD
+            y_z = aikit.solve(matrix_a, aikit.concat([matrix_b, f_], axis=-1))
+
+            # BS x N x 2,    BS x N x PD
+            y = y_z[..., :2]
+            z = y_z[..., 2:]
+
+        # BS x 2 x 2
+        schur = aikit.matmul(matrix_b_trans, y)
+
+        # BS x 2 x PD
+        v = _solve(schur, aikit.matmul(matrix_b_trans, z))
+
+        # BS x N x PD
+        w = z - aikit.matmul(y, v)
+
+    if not with_residual:
+        return w, v
+
+    with timed_stage("spline_residual"):
+        # BS x N+2 x PD
+        residual = aikit.matmul(matrix_a, w) + aikit.matmul(matrix_b, v) - f_
+        residual = aikit.concat([residual, aikit.matmul(matrix_b_trans, w)], axis=-2)
+    return w, v, residual
+
+
+def _fit_spline(train_points, train_values, order, solver="schur"):
+    increment_counter("spline_fits")
+    if solver == "schur":
+        return _fit_spline_schur(train_points, train_values, order)
+    if solver == "pinv":
+        return _fit_spline_pinv(train_points, train_values, order)
+    if solver != "auto":
+        raise Exception(
+            "Invalid solver {}, must be one of: schur, pinv, auto".format(solver)
+        )
+
+    try:
+        # BS x N x PD,    BS x 2 x PD,    BS x N+2 x PD
+        w, v, residual = _fit_spline_schur(
+            train_points, train_values, order, with_residual=True
+        )
+    except Exception:
+        # numpy, torch and tensorflow raise on exactly singular kernel blocks, such
+        # as those of duplicate anchors, without reporting the batch element
+        increment_counter("spline_pinv_fallbacks")
+        return _fit_spline_pinv(train_points, train_values, order)
+
+    # B, batch elements for which the LU solves failed without raising, giving
+    # non-finite weights
+    batch_shape = list(w.shape[:-2])
+    failed = aikit.logical_not(
+        aikit.reshape(aikit.all(aikit.isfinite(residual), axis=(-2, -1)), (-1,))
+    )
+
+    # F
+    failed_ids = aikit.nonzero(failed)[0]
+    num_failed = failed_ids.shape[0]
+    if num_failed == 0:
+        return w, v
+    increment_counter("spline_pinv_fallbacks", num_failed)
 
-    # BS x 2 x PD
-    v = w_v[..., n:, :]
+    # the pseudo-inverse is only computed for the failed elements
+
+    # F x N x 1
+    if len(train_points.shape) > 2:
+        train_points = aikit.gather(
+            aikit.reshape(train_points, [-1] + list(train_points.shape[-2:])),
+            failed_ids,
+            axis=0,
+        )
+
+    # F x N x PD,    F x 2 x PD
+    pinv_w, pinv_v = _fit_spline_pinv(
+        train_points,
+        aikit.gather(
+            aikit.reshape(train_values, [-1] + list(train_values.shape[-2:])),
+            failed_ids,
+            axis=0,
+        ),
+        order,
+    )
+
+    # B, indices into the concatenation of the LU and pseudo-inverse solutions
+    num_elements = failed.shape[0]
+    ids = aikit.where(
+        failed,
+        aikit.cumsum(aikit.astype(failed, "int64"), axis=0) - 1 + num_elements,
+        aikit.arange(num_elements, dtype="int64", device=aikit.dev(failed_ids)),
+    )
 
     # BS x N x PD,    BS x 2 x PD
-    print(w, v)
-    return w, v
+    return tuple(
+        aikit.reshape(
+            aikit.gather(
+                aikit.concat(
+                    [aikit.reshape(x, [-1] + list(x.shape[-2:])), pinv_x], axis=0
+                ),
+                ids,
+                axis=0,
+            ),
+            batch_shape + list(x.shape[-2:]),
+        )
+        for x, pinv_x in ((w, pinv_w), (v, pinv_v))
+    )
+
+
+def _sample_spline(sample_points, anchor_points, w, v, order):
+    with timed_stage("spline_sample"):
+        # Kernel term
+
+        # BS x NS x N
+        pairwise_dists = _pairwise_distance(sample_points, anchor_points)
+        phi_pairwise_dists = _phi(pairwise_dists, order)
+
+        # BS x NS x PD
+        rbf_term = aikit.matmul(phi_pairwise_dists, w)
+
+        # Polynomial / linear term.
+
+        # BS x NS x 2
+        query_points_pad = aikit.concat(
+            [sample_points, aikit.ones_like(sample_points[..., :1])], axis=-1
+        )
+
+        # BS x NS x PD
+        linear_term = aikit.matmul(query_points_pad, v)
+        return rbf_term + linear_term
+
+
+def _sample_spline_with_derivatives(sample_points, anchor_points, w, v, order):
+    with timed_stage("spline_sample"):
+        # BS x NS x N
+        diffs = sample_points - aikit.swapaxes(anchor_points, -1, -2)
+        phi_pairwise_dists = _phi(diffs**2, order)
+        phi_first, phi_second = _phi_derivatives(diffs, order)
+
+        # BS x NS x 2
+        query_points_pad = aikit.concat(
+            [sample_points, aikit.ones_like(sample_points[..., :1])], axis=-1
+        )
+
+        # BS x NS x PD
+        positions = aikit.matmul(phi_pairwise_dists, w) + aikit.matmul(
+            query_points_pad, v
+        )
+        velocities = aikit.matmul(phi_first, w) + v[..., 0:1, :]
+        accelerations = aikit.matmul(phi_second, w)
+        return positions, velocities, accelerations
+
+
+def _spline_basis(anchor_points, sample_points, order, solver):
+    # the sampled path is linear in the anchor values, so the influence matrix is
+    # the spline fitted to the identity
+
+    # BS x N x N
+    identity = aikit.eye(
+        anchor_points.shape[-2],
+        batch_shape=list(anchor_points.shape[:-2]),
+        dtype=anchor_points.dtype,
+    )
+
+    # BS x N x N,    BS x 2 x N
+    w, v = _fit_spline(anchor_points, identity, order, solver)
+
+    # BS x NS x N
+    return _sample_spline(sample_points, anchor_points, w, v, order)
+
+
+def _local_spline_coords(sample_points, anchor_points):
+    # local bases assume anchors evenly spaced between the first and last anchor
+    n = anchor_points.shape[-2]
+
+    # BS x 1 x 1
+    start = anchor_points[..., 0:1, :]
+    end = anchor_points[..., -1:, :]
+
+    # BS x NS x 1
+    t = (sample_points - start) / (end - start) * (n - 1)
+    segment = aikit.clip(aikit.floor(t), 0, n - 2)
+    u = t - segment
+
+    # BS x 1 x 1
+    scale = (n - 1) / (end - start)
+
+    # BS x NS x 4
+    indices = aikit.clip(
+        aikit.astype(segment, "int64")
+        + aikit.arange(-1, 3, dtype="int64", device=aikit.dev(segment)),
+        0,
+        n - 1,
+    )
+    return indices, u, scale
+
+
+def _gather_anchor_vals(anchor_vals, indices):
+    if len(indices.shape) == 2 or len(anchor_vals.shape) == 2:
+        # shared layout or shared values, a single gather along the anchor axis
+        flat_indices = aikit.reshape(indices, (-1,))
+        if len(anchor_vals.shape) == 2:
+            return aikit.reshape(
+                aikit.gather(anchor_vals, flat_indices, axis=0),
+                list(indices.shape) + [anchor_vals.shape[-1]],
+            )
+        return aikit.reshape(
+            aikit.gather(anchor_vals, flat_indices, axis=-2),
+            list(anchor_vals.shape[:-2]) + list(indices.shape) + [-1],
+        )
+
+    # shapes
+    batch_shape = list(indices.shape[:-2])
+    ns, k = indices.shape[-2:]
+    n, pd = anchor_vals.shape[-2:]
+
+    # (BSxN) x PD
+    flat_vals = aikit.reshape(anchor_vals, (-1, pd))
+    num_batch = flat_vals.shape[0] // n
+
+    # (BSxNSxK)
+    offsets = aikit.expand_dims(
+        aikit.arange(num_batch, dtype="int64", device=aikit.dev(flat_vals)) * n, axis=-1
+    )
+    flat_indices = aikit.reshape(
+        aikit.reshape(indices, (num_batch, -1)) + offsets, (-1,)
+    )
+
+    # BS x NS x K x PD
+    return aikit.reshape(
+        aikit.gather(flat_vals, flat_indices, axis=0), batch_shape + [ns, k, pd]
+    )
+
+
+def _local_basis_matrix(basis, like):
+    # 4 x 4, matching the dtype and device of the array like
+    return _local_basis_constants.get(basis, like.dtype, aikit.dev(like))
+
+
+def _sample_local_spline(sample_points, anchor_points, anchor_vals, basis):
+    with timed_stage("spline_sample"):
+        # BS x NS x 4,    BS x NS x 1,    BS x 1 x 1
+        indices, u, _ = _local_spline_coords(sample_points, anchor_points)
+
+        # BS x NS x 4
+        powers = aikit.concat([aikit.ones_like(u), u, u**2, u**3], axis=-1)
+        weights = aikit.matmul(powers, _local_basis_matrix(basis, powers))
+
+        # BS x NS x 4 x PD
+        local_vals = _gather_anchor_vals(anchor_vals, indices)
+
+        # BS x NS x PD
+        return aikit.sum(aikit.expand_dims(weights, axis=-1) * local_vals, axis=-2)
+
+
+def _sample_local_spline_with_derivatives(
+    sample_points, anchor_points, anchor_vals, basis
+):
+    with timed_stage("spline_sample"):
+        # BS x NS x 4,    BS x NS x 1,    BS x 1 x 1
+        indices, u, scale = _local_spline_coords(sample_points, anchor_points)
+
+        # 4 x 4
+        basis_matrix = _local_basis_matrix(basis, u)
+
+        # BS x NS x 4
+        ones = aikit.ones_like(u)
+        zeros = aikit.zeros_like(u)
+        powers = aikit.concat([ones, u, u**2, u**3], axis=-1)
+        first_powers = aikit.concat([zeros, ones, 2 * u, 3 * u**2], axis=-1) * scale
+        second_powers = (
+            aikit.concat([zeros, zeros, 2 * ones, 6 * u], axis=-1) * scale**2
+        )
+
+        # BS x NS x 4 x PD
+        local_vals = _gather_anchor_vals(anchor_vals, indices)
+
+        # BS x NS x PD
+        return tuple(
+            aikit.sum(
+                aikit.expand_dims(aikit.matmul(p, basis_matrix), axis=-1) * local_vals,
+                axis=-2,
+            )
+            for p in (powers, first_powers, second_powers)
+        )
+
+
+def _sample_in_chunks(spline_path, sample_points, chunk_size):
+    num_samples = sample_points.shape[-2]
+    for chunk_start in range(0, num_samples, chunk_size):
+        yield spline_path.sample(
+            sample_points[..., chunk_start : chunk_start + chunk_size, :]
+        )
+
+
+def _move_last_to(x, index):
+    # moves the last row and column of the trailing square matrix to index
+    x = aikit.concat([x[..., :index, :], x[..., -1:, :], x[..., index:-1, :]], axis=-2)
+    return aikit.concat([x[..., :index], x[..., -1:], x[..., index:-1]], axis=-1)
+
+
+def _move_to_last(x, index):
+    # moves row and column index of the trailing square matrix to the end
+    x = aikit.concat(
+        [x[..., :index, :], x[..., index + 1 :, :], x[..., index : index + 1, :]],
+        axis=-2,
+    )
+    return aikit.concat(
+        [x[..., :index], x[..., index + 1 :], x[..., index : index + 1]], axis=-1
+    )
+
+
+def _layout_key(x):
+    return tuple(x.shape), str(x.dtype), aikit.to_numpy(x).tobytes()
 
 
 # Public #
 # -------#
 
+# 4 x 4 cubic basis matrices, mapping powers [1, u, u^2, u^3] of the local
+# segment parameter to the weights of the four surrounding anchors
+_LOCAL_BASIS_MATRICES = {
+    "bspline": [
+        [1 / 6, 4 / 6, 1 / 6, 0.0],
+        [-3 / 6, 0.0, 3 / 6, 0.0],
+        [3 / 6, -6 / 6, 3 / 6, 0.0],
+        [-1 / 6, 3 / 6, -3 / 6, 1 / 6],
+    ],
+    "catmull_rom": [
+        [0.0, 1.0, 0.0, 0.0],
+        [-0.5, 0.0, 0.5, 0.0],
+        [1.0, -2.5, 2.0, -0.5],
+        [-0.5, 1.5, -1.5, 0.5],
+    ],
+}
+_local_basis_constants = ConstantCache()
+for _basis, _basis_matrix in _LOCAL_BASIS_MATRICES.items():
+    _local_basis_constants.register(_basis, _basis_matrix)
+SPLINE_BASIS_CACHE_SIZE = 32
+SPLINE_CHUNK_SIZE = 1024
+_spline_basis_cache = OrderedDict()
+
+
+class _BaseSplinePath:
+    # Sampling shared by all spline paths, which each implement _sample and
+    # _sample_with_derivatives for their basis
+
+    # Properties #
+    # -----------#
+
+    @property
+    def anchor_points(self):
+        return self._anchor_points
+
+    # Public Methods #
+    # ---------------#
+
+    def sample(self, sample_points):
+        """Sample the spline path at the given sample locations.
+
+        Parameters
+        ----------
+        sample_points
+            Sample locations between 0-1 *[batch_shape,num_samples,1]*
+
+        Returns
+        -------
+        ret
+            Spline path sampled at sample_locations, giving points in path space
+            *[batch_shape,num_samples,path_dim]*
+
+        """
+        return self._sample(sample_points)
+
+    def sample_chunks(self, sample_points, chunk_size=SPLINE_CHUNK_SIZE):
+        """Lazily sample the spline path in chunks of sample locations, reusing the
+        fitted path, so that peak memory scales with the chunk size rather than
+        the total number of samples.
+
+        Parameters
+        ----------
+        sample_points
+            Sample locations between 0-1 *[batch_shape,num_samples,1]*
+        chunk_size
+            Maximum number of sample locations per chunk (Default value = 1024)
+
+        Returns
+        -------
+        ret
+            Generator of the spline path sampled at consecutive chunks of the
+            sample locations *[batch_shape,chunk_size,path_dim]*
+
+        """
+        return _sample_in_chunks(self, sample_points, chunk_size)
+
+    def sample_with_derivatives(self, sample_points):
+        """Sample the spline path together with its first and second derivatives
+        with respect to the path parameter, computed analytically in the same
+        pass.
+
+        Parameters
+        ----------
+        sample_points
+            Sample locations between 0-1 *[batch_shape,num_samples,1]*
+
+        Returns
+        -------
+        ret
+            Spline path positions, velocities and accelerations sampled at
+            sample_locations, each *[batch_shape,num_samples,path_dim]*
+
+        """
+        return self._sample_with_derivatives(sample_points)
+
+
+class SplinePath(_BaseSplinePath):
+    def __init__(self, anchor_points, w, v, order=3):
+        """Initialize fitted spline path instance. The spline weights are kept so
+        that the path can be sampled repeatedly, at arbitrary query points, without
+        refitting. Instances are normally created with :func:`fit_spline_path`.
+
+        Parameters
+        ----------
+        anchor_points
+            Anchor locations between 0-1 *[batch_shape,num_anchors,1]*
+        w
+            Kernel weights of the fitted spline *[batch_shape,num_anchors,path_dim]*
+        v
+            Linear weights of the fitted spline *[batch_shape,2,path_dim]*
+        order
+            Order of the spline path interpolation (Default value = 3)
+
+        """
+        self._anchor_points = anchor_points
+        self._w = w
+        self._v = v
+        self._order = order
+
+    # Private Methods #
+    # ----------------#
+
+    def _sample(self, sample_points):
+        return _sample_spline(
+            sample_points, self._anchor_points, self._w, self._v, self._order
+        )
+
+    def _sample_with_derivatives(self, sample_points):
+        return _sample_spline_with_derivatives(
+            sample_points, self._anchor_points, self._w, self._v, self._order
+        )
+
+    # Properties #
+    # -----------#
+
+    @property
+    def w(self):
+        return self._w
+
+    @property
+    def v(self):
+        return self._v
+
+    @property
+    def order(self):
+        return self._order
+
+
+class IncrementalSplinePath(SplinePath):
+    def __init__(self, anchor_points, anchor_vals, order=3):
+        """Initialize incrementally editable spline path instance. The inverse of
+        the spline system is kept, and updated with bordered-matrix rank-one
+        updates when single anchors are inserted, removed or moved, so each edit
+        costs O(num_anchors^2) rather than a full O(num_anchors^3) refit.
+
+        Parameters
+        ----------
+        anchor_points
+            Anchor locations between 0-1 (regular spacing not necessary)
+            *[batch_shape,num_anchors,1]*
+        anchor_vals
+            Anchor points along the spline path, in path space
+            *[batch_shape,num_anchors,path_dim]*
+        order
+            Order of the spline path interpolation (Default value = 3)
+
+        """
+        self._anchor_points = anchor_points
+        self._anchor_vals = anchor_vals
+        self._order = order
+        self.refit()
+
+    # Private Methods #
+    # ----------------#
+
+    def _update_weights(self):
+        n = self._anchor_points.shape[-2]
+
+        # BS x N+2 x PD
+        w_v = aikit.matmul(self._lhs_inv[..., :n], self._anchor_vals)
+
+        # BS x N x PD,    BS x 2 x PD
+        self._w = w_v[..., :n, :]
+        self._v = w_v[..., n:, :]
+
+    # Properties #
+    # -----------#
+
+    @property
+    def anchor_vals(self):
+        return self._anchor_vals
+
+    # Public Methods #
+    # ---------------#
+
+    def refit(self):
+        """Refactor the spline system from scratch, discarding any numerical drift
+        accumulated by incremental updates."""
+        # BS x N+2 x N+2
+        self._lhs_inv = aikit.inv(_spline_lhs(self._anchor_points, self._order))
+        self._update_weights()
+
+    def insert_anchor(self, anchor_point, anchor_val, index=None):
+        """Insert a single anchor into the spline path.
+
+        Parameters
+        ----------
+        anchor_point
+            Location of the new anchor between 0-1 *[batch_shape,1]*
+        anchor_val
+            Value of the new anchor, in path space *[batch_shape,path_dim]*
+        index
+            Anchor index at which to insert the new anchor. Default is to append.
+
+        """
+        n = self._anchor_points.shape[-2]
+        index = n if index is None else index
+
+        # BS x 1 x 1
+        p = aikit.expand_dims(anchor_point, axis=-2)
+
+        # BS x N+2 x 1
+        border = aikit.concat(
+            [
+                _phi(_pairwise_distance(self._anchor_points, p), self._order),
+                p,
+                aikit.ones_like(p),
+            ],
+            axis=-2,
+        )
+
+        # BS x 1 x 1
+        diagonal = _phi(aikit.zeros_like(p), self._order)
+
+        # BS x N+2 x 1
+        u = aikit.matmul(self._lhs_inv, border)
+
+        # BS x 1 x 1
+        schur = diagonal - aikit.matmul(aikit.swapaxes(border, -1, -2), u)
+
+        # BS x N+3 x N+3, with the new anchor last
+        u_trans = aikit.swapaxes(u, -1, -2)
+        lhs_inv = aikit.concat(
+            [
+                aikit.concat(
+                    [self._lhs_inv + aikit.matmul(u, u_trans) / schur, -u / schur],
+                    axis=-1,
+                ),
+                aikit.concat([-u_trans / schur, 1 / schur], axis=-1),
+            ],
+            axis=-2,
+        )
+        self._lhs_inv = _move_last_to(lhs_inv, index)
+
+        # BS x N+1 x 1,    BS x N+1 x PD
+        self._anchor_points = aikit.concat(
+            [
+                self._anchor_points[..., :index, :],
+                p,
+                self._anchor_points[..., index:, :],
+            ],
+            axis=-2,
+        )
+        self._anchor_vals = aikit.concat(
+            [
+                self._anchor_vals[..., :index, :],
+                aikit.expand_dims(anchor_val, axis=-2),
+                self._anchor_vals[..., index:, :],
+            ],
+            axis=-2,
+        )
+        self._update_weights()
+
+    def remove_anchor(self, index):
+        """Remove a single anchor from the spline path.
+
+        Parameters
+        ----------
+        index
+            Index of the anchor to remove.
+
+        """
+        # BS x N+2 x N+2, with the removed anchor last
+        lhs_inv = _move_to_last(self._lhs_inv, index)
+
+        # BS x N+1 x 1,    BS x 1 x 1
+        q = lhs_inv[..., :-1, -1:]
+        s = lhs_inv[..., -1:, -1:]
+
+        # BS x N+1 x N+1
+        self._lhs_inv = (
+            lhs_inv[..., :-1, :-1] - aikit.matmul(q, aikit.swapaxes(q, -1, -2)) / s
+        )
+
+        # BS x N-1 x 1,    BS x N-1 x PD
+        self._anchor_points = aikit.concat(
+            [
+                self._anchor_points[..., :index, :],
+                self._anchor_points[..., index + 1 :, :],
+            ],
+            axis=-2,
+        )
+        self._anchor_vals = aikit.concat(
+            [self._anchor_vals[..., :index, :], self._anchor_vals[..., index + 1 :, :]],
+            axis=-2,
+        )
+        self._update_weights()
+
+    def move_anchor(self, index, anchor_point=None, anchor_val=None):
+        """Move a single anchor of the spline path to a new location and/or value.
+
+        Parameters
+        ----------
+        index
+            Index of the anchor to move.
+        anchor_point
+            New location of the anchor between 0-1 *[batch_shape,1]*. Default is to
+            keep the current location.
+        anchor_val
+            New value of the anchor, in path space *[batch_shape,path_dim]*. Default
+            is to keep the current value.
+
+        """
+        if anchor_val is None:
+            anchor_val = self._anchor_vals[..., index, :]
+        if anchor_point is not None:
+            self.remove_anchor(index)
+            self.insert_anchor(anchor_point, anchor_val, index)
+            return
+        # only the values changed, the factorization is unaffected
+        self._anchor_vals = aikit.concat(
+            [
+                self._anchor_vals[..., :index, :],
+                aikit.expand_dims(anchor_val, axis=-2),
+                self._anchor_vals[..., index + 1 :, :],
+            ],
+            axis=-2,
+        )
+        self._update_weights()
+
+
+class LocalSplinePath(_BaseSplinePath):
+    def __init__(self, anchor_points, anchor_vals, basis="catmull_rom"):
+        """Initialize local-support spline path instance. Each sample only depends
+        on the four surrounding anchors, which are gathered rather than weighted
+        densely, so sampling costs O(1) per sample regardless of the number of
+        anchors. The anchors are assumed to be evenly spaced between the first and
+        last anchor location. Instances are normally created with
+        :func:`fit_spline_path`.
+
+        Parameters
+        ----------
+        anchor_points
+            Anchor locations between 0-1, evenly spaced *[batch_shape,num_anchors,1]*
+        anchor_vals
+            Anchor points along the spline path, in path space
+            *[batch_shape,num_anchors,path_dim]*
+        basis
+            Local spline basis, either "catmull_rom", which interpolates the anchor
+            points, or "bspline", a uniform cubic B-spline which treats the anchor
+            points as control points. (Default value = "catmull_rom")
+
+        """
+        if basis not in _LOCAL_BASIS_MATRICES:
+            raise Exception(
+                "Invalid local basis {}, must be one of: {}".format(
+                    basis, ", ".join(_LOCAL_BASIS_MATRICES)
+                )
+            )
+        self._anchor_points = anchor_points
+        self._anchor_vals = anchor_vals
+        self._basis = basis
+
+    # Private Methods #
+    # ----------------#
+
+    def _sample(self, sample_points):
+        return _sample_local_spline(
+            sample_points, self._anchor_points, self._anchor_vals, self._basis
+        )
+
+    def _sample_with_derivatives(self, sample_points):
+        return _sample_local_spline_with_derivatives(
+            sample_points, self._anchor_points, self._anchor_vals, self._basis
+        )
+
+    # Properties #
+    # -----------#
+
+    @property
+    def anchor_vals(self):
+        return self._anchor_vals
+
+    @property
+    def basis(self):
+        return self._basis
+
+
+def fit_spline_path(anchor_points, anchor_vals, order=3, solver="schur", basis="rbf"):
+    """
+    Fit spline path to the anchor locations and points, returning a
+    :class:`SplinePath` which can be sampled many times without refitting.
+
+    Parameters
+    ----------
+    anchor_points
+        Anchor locations between 0-1 (regular spacing not necessary)
+        *[batch_shape,num_anchors,1]*, or *[num_anchors,1]* to share the same
+        layout across a batch of anchor values, in which case the spline system
+        is only factorized once for the whole batch.
+    anchor_vals
+        Anchor points along the spline path, in path space
+        *[batch_shape,num_anchors,path_dim]*
+    order
+        Order of the spline path interpolation (Default value = 3)
+    solver
+        Solver for the spline system, either "schur", which solves the structured
+        saddle-point system with batched LU solves, "pinv", which uses the
+        pseudo-inverse of the full system, or "auto", which uses the LU solves and
+        falls back to the pseudo-inverse for the batch elements where they fail.
+        "schur" never leaves the device, but singular layouts, such as duplicate
+        anchor locations, raise an error or give non-finite paths, depending on
+        the backend. "auto" handles these layouts, at the cost of one host sync
+        per fit to find the failed elements. (Default value = "schur")
+    basis
+        Path basis, either "rbf" for the global polyharmonic spline, or one of the
+        local-support cubic bases "catmull_rom" or "bspline", for which each
+        sample only depends on four anchors. Local bases assume evenly spaced
+        anchors, and ignore order and solver. (Default value = "rbf")
+
+    Returns
+    -------
+    ret
+        The fitted spline path.
 
-def sample_spline_path(anchor_points, anchor_vals, sample_points, order=3):
+    """
+    if basis != "rbf":
+        return LocalSplinePath(anchor_points, anchor_vals, basis)
+
+    # BS x N x PD,    BS x 2 x PD
+    w, v = _fit_spline(anchor_points, anchor_vals, order, solver)
+    return SplinePath(anchor_points, w, v, order)
+
+
+def sample_spline_path(
+    anchor_points, anchor_vals, sample_points, order=3, solver="schur", basis="rbf"
+):
     """
     Sample spline path, given sample locations for path defined by the anchor
     locations and points. `[reference]
@@ -112,7 +951,9 @@ def sample_spline_path(anchor_points, anchor_vals, sample_points, order=3):
     ----------
     anchor_points
         Anchor locations between 0-1 (regular spacing not necessary)
-        *[batch_shape,num_anchors,1]*
+        *[batch_shape,num_anchors,1]*, or *[num_anchors,1]* to share the same
+        layout across a batch of anchor values, in which case the spline system
+        is only factorized once for the whole batch.
     anchor_vals
         Anchor points along the spline path, in path space
         *[batch_shape,num_anchors,path_dim]*
@@ -120,6 +961,11 @@ def sample_spline_path(anchor_points, anchor_vals, sample_points, order=3):
         Sample locations between 0-1 *[batch_shape,num_samples,1]*
     order
         Order of the spline path interpolation (Default value = 3)
+    solver
+        Solver for the spline system, see :func:`fit_spline_path`.
+        (Default value = "schur")
+    basis
+        Path basis, see :func:`fit_spline_path`. (Default value = "rbf")
 
     Returns
     -------
@@ -128,25 +974,147 @@ def sample_spline_path(anchor_points, anchor_vals, sample_points, order=3):
         *[batch_shape,num_samples,path_dim]*
 
     """
-    # BS x N x PD,    BS x 2 x PD
-    w, v = _fit_spline(anchor_points, anchor_vals, order)
+    return fit_spline_path(anchor_points, anchor_vals, order, solver, basis).sample(
+        sample_points
+    )
 
-    # Kernel term
 
-    # BS x NS x N
-    pairwise_dists = _pairwise_distance(sample_points, anchor_points)
-    phi_pairwise_dists = _phi(pairwise_dists, order)
+def iterate_spline_path(
+    anchor_points,
+    anchor_vals,
+    sample_points,
+    chunk_size=SPLINE_CHUNK_SIZE,
+    order=3,
+    solver="schur",
+    basis="rbf",
+):
+    """
+    Sample spline path in chunks of sample locations, fitting the path once and
+    yielding the sampled path one chunk at a time. Peak memory scales with the
+    chunk size rather than the total number of samples, which makes dense
+    sampling of long paths feasible.
+
+    Parameters
+    ----------
+    anchor_points
+        Anchor locations between 0-1 (regular spacing not necessary)
+        *[batch_shape,num_anchors,1]*
+    anchor_vals
+        Anchor points along the spline path, in path space
+        *[batch_shape,num_anchors,path_dim]*
+    sample_points
+        Sample locations between 0-1 *[batch_shape,num_samples,1]*
+    chunk_size
+        Maximum number of sample locations per chunk (Default value = 1024)
+    order
+        Order of the spline path interpolation (Default value = 3)
+    solver
+        Solver for the spline system, see :func:`fit_spline_path`.
+        (Default value = "schur")
+    basis
+        Path basis, see :func:`fit_spline_path`. (Default value = "rbf")
+
+    Returns
+    -------
+    ret
+        Generator of the spline path sampled at consecutive chunks of the sample
+        locations *[batch_shape,chunk_size,path_dim]*
+
+    """
+    spline_path = fit_spline_path(anchor_points, anchor_vals, order, solver, basis)
+    return spline_path.sample_chunks(sample_points, chunk_size)
+
+
+def spline_basis(anchor_points, sample_points, order=3, solver="schur"):
+    """
+    Compute the linear influence matrix mapping anchor values to sampled path
+    points, for a fixed layout of anchor and sample locations. The spline path is
+    linear in the anchor values, so for a fixed layout sampling reduces to a
+    single matmul, see :func:`sample_spline_path_from_basis`. For a fixed layout,
+    such as every step of a path optimization, the matrix should be computed once
+    and passed to each step. Results are also cached, keyed on the contents of the
+    anchor and sample layouts and the order, as a convenience for callers which
+    cannot hold on to the matrix, but computing the key copies both layouts to the
+    host.
 
-    # BS x NS x PD
-    rbf_term = aikit.matmul(phi_pairwise_dists, w)
+    Parameters
+    ----------
+    anchor_points
+        Anchor locations between 0-1 (regular spacing not necessary)
+        *[batch_shape,num_anchors,1]*
+    sample_points
+        Sample locations between 0-1 *[batch_shape,num_samples,1]*
+    order
+        Order of the spline path interpolation (Default value = 3)
+    solver
+        Solver for the spline system, see :func:`fit_spline_path`.
+        (Default value = "schur")
 
-    # Polynomial / linear term.
+    Returns
+    -------
+    ret
+        The spline influence matrix *[batch_shape,num_samples,num_anchors]*
 
-    # BS x NS x 2
-    query_points_pad = aikit.concat(
-        [sample_points, aikit.ones_like(sample_points[..., :1])], axis=-1
+    """
+    key = (
+        aikit.current_backend_str(),
+        str(aikit.dev(anchor_points)),
+        _layout_key(anchor_points),
+        _layout_key(sample_points),
+        order,
+        solver,
+    )
+    if key in _spline_basis_cache:
+        _spline_basis_cache.move_to_end(key)
+        return _spline_basis_cache[key]
+    basis = aikit.stop_gradient(
+        _spline_basis(anchor_points, sample_points, order, solver)
     )
+    _spline_basis_cache[key] = basis
+    if len(_spline_basis_cache) > SPLINE_BASIS_CACHE_SIZE:
+        _spline_basis_cache.popitem(last=False)
+    return basis
+
+
+def clear_spline_basis_cache():
+    """Clear all influence matrices cached by :func:`spline_basis`."""
+    _spline_basis_cache.clear()
+
+
+def sample_spline_path_from_basis(basis, anchor_vals):
+    """
+    Sample spline path using a precomputed influence matrix, as returned by
+    :func:`spline_basis`. The sampled path is linear in the anchor values, so the
+    gradient with respect to them is computed in closed form with the transposed
+    influence matrix, instead of differentiating through the spline fit. No
+    gradient is propagated to the influence matrix itself.
+
+    Parameters
+    ----------
+    basis
+        The spline influence matrix *[batch_shape,num_samples,num_anchors]*
+    anchor_vals
+        Anchor points along the spline path, in path space
+        *[batch_shape,num_anchors,path_dim]*
+
+    Returns
+    -------
+    ret
+        Spline path sampled at the sample locations of the basis, giving points in
+        path space *[batch_shape,num_samples,path_dim]*
+
+    """
+    num_vals_dims = len(anchor_vals.shape)
+
+    def _sample(x):
+        return aikit.matmul(basis, x)
+
+    def _sample_grad(xs, upstream):
+        # BS x N x PD
+        grad = aikit.matmul(aikit.swapaxes(basis, -1, -2), upstream)
+        if len(grad.shape) > num_vals_dims:
+            # anchor values were broadcast across a batched basis
+            grad = aikit.sum(grad, axis=tuple(range(len(grad.shape) - num_vals_dims)))
+        return grad
 
-    # BS x NS x PD
-    linear_term = aikit.matmul(query_points_pad, v)
-    return rbf_term + linear_term
+    return aikit.bind_custom_gradient_function(_sample, _sample_grad)(anchor_vals)
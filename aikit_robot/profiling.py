@@ -0,0 +1,220 @@
+"""Opt-in instrumentation of the aikit robot hot paths, with stage timers and call
+counters. Nothing is recorded, and no host-side work is done, unless profiling is
+enabled."""
+
+# global
+import time
+
+_active_stats = list()
+
+
+class ProfileStats:
+    def __init__(self):
+        """Initialize profile stats instance, holding the accumulated wall-clock
+        time and number of calls for each instrumented stage, as well as any
+        event counters."""
+        self._times = dict()
+        self._calls = dict()
+        self._counters = dict()
+
+    # Properties #
+    # -----------#
+
+    @property
+    def times(self):
+        return self._times
+
+    @property
+    def calls(self):
+        return self._calls
+
+    @property
+    def counters(self):
+        return self._counters
+
+    # Public Methods #
+    # ---------------#
+
+    def record(self, stage_name, elapsed):
+        """Record a single timed call of a stage.
+
+        Parameters
+        ----------
+        stage_name
+            Name of the stage.
+        elapsed
+            Elapsed wall-clock time of the call, in seconds.
+
+        """
+        self._times[stage_name] = self._times.get(stage_name, 0.0) + elapsed
+        self._calls[stage_name] = self._calls.get(stage_name, 0) + 1
+
+    def increment(self, counter_name, amount=1):
+        """Increment an event counter.
+
+        Parameters
+        ----------
+        counter_name
+            Name of the counter.
+        amount
+            Amount to increment the counter by (Default value = 1)
+
+        """
+        self._counters[counter_name] = self._counters.get(counter_name, 0) + amount
+
+    def reset(self):
+        """Clear all recorded times, calls and counters."""
+        self._times.clear()
+        self._calls.clear()
+        self._counters.clear()
+
+    def __repr__(self):
+        lines = [
+            "{}: {} calls, {:.6f}s".format(name, self._calls[name], self._times[name])
+            for name in self._times
+        ]
+        lines += [
+            "{}: {}".format(name, count) for name, count in self._counters.items()
+        ]
+        return "ProfileStats(\n  " + "\n  ".join(lines) + "\n)"
+
+
+class _Stage:
+    def __init__(self, stage_name):
+        self._stage_name = stage_name
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        elapsed = time.perf_counter() - self._start
+        for stats in _active_stats:
+            stats.record(self._stage_name, elapsed)
+        return False
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_null_stage = _NullStage()
+
+
+class _Profile:
+    def __init__(self, stats):
+        self._stats = stats
+
+    def __enter__(self):
+        _active_stats.append(self._stats)
+        return self._stats
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._stats in _active_stats:
+            _active_stats.remove(self._stats)
+        return False
+
+
+# Instrumentation #
+# ----------------#
+
+
+def timed_stage(stage_name):
+    """Context manager timing a stage of an instrumented function. This is a no-op
+    unless profiling is enabled. Timings measure host wall-clock time, so for
+    asynchronous backends they only include the dispatch of device work.
+
+    Parameters
+    ----------
+    stage_name
+        Name of the stage.
+
+    Returns
+    -------
+    ret
+        The stage context manager.
+
+    """
+    if not _active_stats:
+        return _null_stage
+    return _Stage(stage_name)
+
+
+def increment_counter(counter_name, amount=1):
+    """Increment an event counter, if profiling is enabled.
+
+    Parameters
+    ----------
+    counter_name
+        Name of the counter.
+    amount
+        Amount to increment the counter by (Default value = 1)
+
+    """
+    for stats in _active_stats:
+        stats.increment(counter_name, amount)
+
+
+# Public #
+# -------#
+
+
+def profile(stats=None):
+    """Context manager collecting stage timers and counters for all calls made
+    within the context, for example around a single planning call.
+
+    Parameters
+    ----------
+    stats
+        Stats to accumulate into. A new instance is created if None.
+        (Default value = None)
+
+    Returns
+    -------
+    ret
+        Context manager, yielding the :class:`ProfileStats` being collected.
+
+    """
+    return _Profile(ProfileStats() if stats is None else stats)
+
+
+def enable_profiling(stats=None):
+    """Enable profiling globally, aggregating stage timers and counters across all
+    subsequent calls until :func:`disable_profiling` is called.
+
+    Parameters
+    ----------
+    stats
+        Stats to accumulate into. A new instance is created if None.
+        (Default value = None)
+
+    Returns
+    -------
+    ret
+        The :class:`ProfileStats` being collected.
+
+    """
+    stats = ProfileStats() if stats is None else stats
+    _active_stats.append(stats)
+    return stats
+
+
+def disable_profiling(stats=None):
+    """Disable globally enabled profiling.
+
+    Parameters
+    ----------
+    stats
+        Stats returned by :func:`enable_profiling` to stop collecting. All globally
+        collected stats are stopped if None. (Default value = None)
+
+    """
+    if stats is None:
+        _active_stats.clear()
+    elif stats in _active_stats:
+        _active_stats.remove(stats)
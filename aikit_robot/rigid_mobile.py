@@ -1,9 +1,11 @@
 """Rigid Mobile class, containing functions for sampling rigid mobile robots"""
 
 # global
-import aikit_mech
 import aikit
 
+# local
+from aikit_robot.constant_cache import ConstantCache
+
 MIN_DENOMINATOR = 1e-12
 
 
@@ -17,9 +19,15 @@ class RigidMobile:
             Relative body points *[num_body_points,3]*
 
         """
+        # converted lazily to native arrays per backend, device and dtype
+        self._constants = ConstantCache()
+
         # 4 x NBP
-        self._rel_body_points_homo_trans = aikit.swapaxes(
-            aikit_mech.make_coordinates_homogeneous(rel_body_points), 0, 1
+        rel_body_points = aikit.to_list(rel_body_points)
+        self._constants.register(
+            "rel_body_points_homo_trans",
+            [list(coords) for coords in zip(*rel_body_points)]
+            + [[1.0] * len(rel_body_points)],
         )
 
     # Public Methods #
@@ -48,10 +56,16 @@ class RigidMobile:
             batch_shape = inv_ext_mats.shape[:-2]
         batch_shape = list(batch_shape)
 
+        inv_ext_mats = aikit.array(inv_ext_mats)
+
+        # 4 x NBP
+        rel_body_points_homo_trans = self._constants.get(
+            "rel_body_points_homo_trans", inv_ext_mats.dtype, aikit.dev(inv_ext_mats)
+        )
+
         # (BSx3) x NBP
         body_points_trans = aikit.matmul(
-            aikit.reshape(aikit.array(inv_ext_mats), (-1, 4)),
-            self._rel_body_points_homo_trans,
+            aikit.reshape(inv_ext_mats, (-1, 4)), rel_body_points_homo_trans
         )
 
         # BS x NBP x 3
@@ -0,0 +1,98 @@
+# global
+import aikit
+import time
+import argparse
+import numpy as np
+from aikit_robot.manipulator import MicoManipulator, PandaManipulator
+
+
+def time_forward_kinematics(manipulator, joint_angles, num_runs):
+    num_joints = joint_angles.shape[-1]
+    # warm up
+    aikit.to_numpy(manipulator.compute_link_matrices(joint_angles, num_joints))
+    start = time.perf_counter()
+    for _ in range(num_runs):
+        aikit.to_numpy(manipulator.compute_link_matrices(joint_angles, num_joints))
+    return (time.perf_counter() - start) / num_runs
+
+
+def time_joint_matrices(compute_joint_matrices, dh_joint_angles, num_runs):
+    num_joints = dh_joint_angles.shape[-1]
+    # warm up
+    aikit.to_numpy(compute_joint_matrices(dh_joint_angles, num_joints))
+    start = time.perf_counter()
+    for _ in range(num_runs):
+        aikit.to_numpy(compute_joint_matrices(dh_joint_angles, num_joints))
+    return (time.perf_counter() - start) / num_runs
+
+
+def main(batch_sizes=(1, 100, 10000), num_runs=100, fw=None):
+    fw = aikit.choose_random_backend(excluded=["numpy"]) if fw is None else fw
+    aikit.set_backend(fw)
+    print("\nbackend: {}\n".format(fw))
+    for manipulator_class in [MicoManipulator, PandaManipulator]:
+        generic = manipulator_class(specialise_fk=False)
+        specialised = manipulator_class(specialise_fk=True)
+        num_joints = generic._num_joints
+        for batch_size in batch_sizes:
+            joint_angles = aikit.array(
+                np.random.uniform(-np.pi, np.pi, (batch_size, num_joints)),
+                dtype="float32",
+            )
+            generic_time = time_forward_kinematics(generic, joint_angles, num_runs)
+            specialised_time = time_forward_kinematics(
+                specialised, joint_angles, num_runs
+            )
+            print(
+                "{} batch size {}: generic {:.3f}ms, specialised {:.3f}ms, "
+                "speedup {:.2f}x".format(
+                    manipulator_class.__name__,
+                    batch_size,
+                    generic_time * 1000,
+                    specialised_time * 1000,
+                    generic_time / specialised_time,
+                )
+            )
+            # the joint matrices alone, without the chain composition shared by both
+            generic_time = time_joint_matrices(
+                generic._compute_joint_matrices, joint_angles, num_runs
+            )
+            specialised_time = time_joint_matrices(
+                specialised._compute_joint_matrices_specialised, joint_angles, num_runs
+            )
+            print(
+                "{} batch size {}: joint matrices generic {:.3f}ms, specialised "
+                "{:.3f}ms, speedup {:.2f}x".format(
+                    manipulator_class.__name__,
+                    batch_size,
+                    generic_time * 1000,
+                    specialised_time * 1000,
+                    generic_time / specialised_time,
+                )
+            )
+    aikit.previous_backend()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--batch_sizes",
+        type=int,
+        nargs="+",
+        default=[1, 100, 10000],
+        help="batch sizes of joint angles to time forward kinematics for.",
+    )
+    parser.add_argument(
+        "--num_runs",
+        type=int,
+        default=100,
+        help="number of timed runs to average over.",
+    )
+    parser.add_argument(
+        "--backend",
+        type=str,
+        default=None,
+        help="which backend to use. Chooses a random backend if unspecified.",
+    )
+    parsed_args = parser.parse_args()
+    main(parsed_args.batch_sizes, parsed_args.num_runs, parsed_args.backend)
@@ -215,12 +215,7 @@ def compute_length(query_vals):
 
 
 def compute_cost_and_sdfs(
-    learnable_anchor_vals,
-    anchor_points,
-    start_anchor_val,
-    end_anchor_val,
-    query_points,
-    sim,
+    learnable_anchor_vals, basis, start_anchor_val, end_anchor_val, sim
 ):
     anchor_vals = aikit.concat(
         (
@@ -230,9 +225,7 @@ def compute_cost_and_sdfs(
         ),
         axis=0,
     )
-    joint_angles = aikit_robot.sample_spline_path(
-        anchor_points, anchor_vals, query_points
-    )
+    joint_angles = aikit_robot.sample_spline_path_from_basis(basis, anchor_vals)
     link_positions = aikit.permute_dims(
         sim.aikit_manipulator.sample_links(joint_angles), axes=(1, 0, 2)
     )
@@ -261,6 +254,10 @@ def main(interactive=True, try_use_sim=True, fw=None):
         aikit.expand_dims(aikit.linspace(0, 1, num_sample_points), axis=-1), "float32"
     )
 
+    # the anchor and query layouts are fixed, so the spline influence matrix is
+    # computed once, and each optimization step is a single matmul
+    basis = aikit_robot.spline_basis(anchor_points, query_points)
+
     # learnable parameters
     robot_start_config = aikit.array(aikit.astype(sim.robot_start_config, "float32"))
     robot_target_config = aikit.array(aikit.astype(sim.robot_target_config, "float32"))
@@ -285,12 +282,7 @@ def main(interactive=True, try_use_sim=True, fw=None):
     while colliding and it < 11:
         func_ret, grads = aikit.execute_with_gradients(
             lambda xs: compute_cost_and_sdfs(
-                xs,
-                anchor_points,
-                robot_start_config,
-                robot_target_config,
-                query_points,
-                sim,
+                xs, basis, robot_start_config, robot_target_config, sim
             ),
             learnable_anchor_vals,
             ret_grad_idxs=["0"],
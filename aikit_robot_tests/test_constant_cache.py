@@ -0,0 +1,36 @@
+"""
+Collection of tests for the constant cache
+"""
+
+# global
+import aikit
+import numpy as np
+
+# local
+from aikit_robot.constant_cache import ConstantCache
+
+
+def test_constant_cache(device, fw):
+    aikit.set_backend(fw)
+    cache = ConstantCache(cache_size=2)
+    cache.register("ones", [1.0, 1.0, 1.0])
+    assert "ones" in cache
+
+    # converted once per dtype, and then reused
+    ones = cache.get("ones", "float32", device)
+    assert cache.get("ones", "float32", device) is ones
+    assert np.allclose(ones, np.ones(3))
+
+    # least recently used arrays are evicted first
+    cache.get("ones", "float64", device)
+    assert cache.get("ones", "float32", device) is not ones
+
+    # re-registering a constant replaces any converted arrays
+    cache.register("ones", [2.0, 2.0, 2.0])
+    assert np.allclose(cache.get("ones", "float32", device), 2 * np.ones(3))
+
+    # unregistering a constant removes its host values and converted arrays
+    cache.unregister("ones")
+    assert "ones" not in cache
+    assert len(cache._arrays) == 0
+    aikit.previous_backend()
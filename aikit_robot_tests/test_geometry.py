@@ -0,0 +1,71 @@
+"""
+Collection of tests for collision geometry distance functions
+"""
+
+# global
+import aikit
+import numpy as np
+
+# local
+import aikit_robot
+
+
+def _brute_force_segment_distance(starts_a, ends_a, starts_b, ends_b, num_samples):
+    fractions = np.linspace(0, 1, num_samples)[:, None]
+    points_a = starts_a[..., None, :] + fractions * (ends_a - starts_a)[..., None, :]
+    points_b = starts_b[..., None, :] + fractions * (ends_b - starts_b)[..., None, :]
+    return np.min(
+        np.linalg.norm(points_a[..., :, None, :] - points_b[..., None, :, :], axis=-1),
+        axis=(-1, -2),
+    )
+
+
+def test_point_distances(device, fw):
+    aikit.set_backend(fw)
+    points = aikit.array([[0.0, 1.0, 0.0], [2.0, 0.0, 0.0], [-1.0, 0.0, 0.0]])
+    starts = aikit.array([[-0.5, 0.0, 0.0]])
+    ends = aikit.array([[0.5, 0.0, 0.0]])
+    assert np.allclose(
+        aikit_robot.point_segment_distance(points, starts, ends), [1.0, 1.5, 0.5]
+    )
+    assert np.allclose(
+        aikit_robot.point_capsule_distance(points, starts, ends, 0.25),
+        [0.75, 1.25, 0.25],
+    )
+    assert np.allclose(
+        aikit_robot.point_sphere_distance(points, aikit.array([0.0, 0.0, 0.0]), 0.5),
+        [0.5, 1.5, 0.5],
+    )
+    aikit.previous_backend()
+
+
+def test_segment_segment_distance(device, fw):
+    aikit.set_backend(fw)
+    segments = np.random.uniform(-1, 1, (4, 32, 3))
+
+    # degenerate segments of zero length, and parallel segments
+    segments[1, 0:8] = segments[0, 0:8]
+    segments[3, 8:16] = segments[2, 8:16]
+    segments[3, 16:24] = segments[2, 16:24] + 2 * (
+        segments[1, 16:24] - segments[0, 16:24]
+    )
+    distances = aikit_robot.segment_segment_distance(
+        *[aikit.array(s, dtype="float32") for s in segments]
+    )
+    # the brute force distances are upper bounds, within the sample spacing
+    brute_force_distances = _brute_force_segment_distance(*segments, 201)
+    assert np.all(aikit.to_numpy(distances) <= brute_force_distances + 1e-5)
+    assert np.allclose(distances, brute_force_distances, atol=1e-3)
+    assert np.allclose(
+        aikit_robot.capsule_capsule_distance(
+            aikit.array(segments[0], dtype="float32"),
+            aikit.array(segments[1], dtype="float32"),
+            0.1,
+            aikit.array(segments[2], dtype="float32"),
+            aikit.array(segments[3], dtype="float32"),
+            0.2,
+        ),
+        aikit.to_numpy(distances) - 0.3,
+        atol=1e-5,
+    )
+    aikit.previous_backend()
@@ -8,7 +8,12 @@ import pytest
 import numpy as np
 
 # local
-from aikit_robot.manipulator import MicoManipulator
+from aikit_robot.manipulator import (
+    LINK_SAMPLING_WEIGHTS_CACHE_SIZE,
+    Manipulator,
+    MicoManipulator,
+    PandaManipulator,
+)
 
 
 class MicoTestData:
@@ -257,4 +262,431 @@ def test_sample_mico_links(device, fw):
         np.tile(np.expand_dims(td.sampled_link, 0), (5, 1, 1, 1)),
         atol=1e-6,
     )
+    # the interpolation weights are computed once, and reused across batch shapes
+    joint_angles = aikit.array(td.joint_angles)
+    weights = mico._link_sampling_weights(6, 25, joint_angles)
+    assert mico._link_sampling_weights(6, 25, joint_angles) is weights
+
+    # only the most recently used layouts are kept, host values included
+    for samples_per_metre in range(LINK_SAMPLING_WEIGHTS_CACHE_SIZE + 1):
+        mico._link_sampling_weights(6, samples_per_metre + 26, joint_angles)
+    assert ("link_sampling_weights", 6, 25) not in mico._constants
+    assert len(mico._link_sampling_weight_names) == LINK_SAMPLING_WEIGHTS_CACHE_SIZE
+    aikit.previous_backend()
+
+
+def test_sample_mico_links_with_base(device, fw):
+    if fw == "tensorflow_graph":
+        # the need to dynamically infer array shapes
+        # makes this only valid in eager mode currently
+        pytest.skip()
+    aikit.set_backend(fw)
+    # rotation of pi/2 about the z axis, followed by a translation
+    base_inv_ext_mat = np.array(
+        [[0, -1, 0, 0.5], [1, 0, 0, -0.25], [0, 0, 1, 1.0], [0, 0, 0, 1]],
+        dtype=np.float32,
+    )
+    mico = MicoManipulator(aikit.array(base_inv_ext_mat))
+    sampled_link = np.array(td.sampled_link)
+    expected = (
+        np.matmul(sampled_link, base_inv_ext_mat[0:3, 0:3].T)
+        + base_inv_ext_mat[0:3, -1]
+    )
+    assert np.allclose(
+        mico.sample_links(aikit.array(td.joint_angles), 6), expected, atol=1e-5
+    )
+    aikit.previous_backend()
+
+
+def test_specialised_forward_kinematics(device, fw):
+    aikit.set_backend(fw)
+    for manipulator_class in [MicoManipulator, PandaManipulator]:
+        num_joints = manipulator_class()._num_joints
+        joint_angles = aikit.array(
+            np.random.uniform(-np.pi, np.pi, (5, num_joints)), dtype="float32"
+        )
+        assert np.allclose(
+            manipulator_class(specialise_fk=True).compute_link_matrices(
+                joint_angles, num_joints
+            ),
+            manipulator_class(specialise_fk=False).compute_link_matrices(
+                joint_angles, num_joints
+            ),
+            atol=1e-5,
+        )
+    aikit.previous_backend()
+
+
+def test_mico_chain_representation(device, fw):
+    aikit.set_backend(fw)
+    joint_angles = aikit.array(np.tile(np.expand_dims(td.joint_angles, 0), (5, 1)))
+    for chain_composition in ["scan", "sequential"]:
+        affine = MicoManipulator(
+            chain_composition=chain_composition, chain_representation="affine"
+        )
+        homogeneous = MicoManipulator(
+            chain_composition=chain_composition, chain_representation="homogeneous"
+        )
+        assert np.allclose(
+            affine.compute_link_matrices(joint_angles, 6),
+            homogeneous.compute_link_matrices(joint_angles, 6),
+            atol=1e-6,
+        )
+        assert np.allclose(
+            affine.compute_link_poses(joint_angles, 6),
+            homogeneous.compute_link_poses(joint_angles, 6),
+            atol=1e-6,
+        )
+    fk = MicoManipulator().compute_forward_kinematics(joint_angles)
+    assert np.allclose(
+        fk.link_affine_matrices(6),
+        np.tile(np.expand_dims(td.true_link_matrices[..., 0:3, :], 0), (5, 1, 1, 1)),
+        rtol=1e-03,
+        atol=1e-03,
+    )
+    quaternion_poses = fk.link_poses(6, rotation_format="quaternion")
+    assert quaternion_poses.shape == (5, 7, 7)
+    assert np.allclose(quaternion_poses[..., 0:3], fk.link_poses(6)[..., 0:3])
+    assert np.allclose(aikit.vector_norm(quaternion_poses[..., 3:], axis=-1), 1.0)
+    aikit.previous_backend()
+
+
+def test_mico_chain_composition(device, fw):
+    aikit.set_backend(fw)
+    joint_angles = aikit.array(np.tile(np.expand_dims(td.joint_angles, 0), (5, 1)))
+    for link_num in range(1, 7):
+        assert np.allclose(
+            MicoManipulator(chain_composition="scan").compute_link_matrices(
+                joint_angles, link_num
+            ),
+            MicoManipulator(chain_composition="sequential").compute_link_matrices(
+                joint_angles, link_num
+            ),
+            atol=1e-6,
+        )
+    aikit.previous_backend()
+
+
+def test_mico_forward_kinematics(device, fw):
+    if fw == "tensorflow_graph":
+        # the need to dynamically infer array shapes
+        # makes this only valid in eager mode currently
+        pytest.skip()
+    aikit.set_backend(fw)
+    mico = MicoManipulator(fk_cache_size=1)
+    joint_angles = aikit.array(td.joint_angles)
+    fk = mico.compute_forward_kinematics(joint_angles)
+    assert mico.compute_forward_kinematics(joint_angles) is fk
+    assert np.allclose(fk.link_matrices(), td.true_link_matrices, atol=1e-03)
+    assert np.allclose(fk.link_matrices(3), td.true_link_matrices[0:4], atol=1e-03)
+    assert np.allclose(
+        fk.link_poses(4), mico.compute_link_poses(joint_angles, 4), atol=1e-6
+    )
+    assert np.allclose(fk.sample_links(), td.sampled_link, atol=1e-6)
+    aikit.previous_backend()
+
+
+def test_mico_jacobian(device, fw):
+    aikit.set_backend(fw)
+    mico = MicoManipulator()
+    h = 1e-4
+    jacobian = aikit.to_numpy(mico.compute_jacobian(aikit.array(td.joint_angles)))
+    all_jacobians = aikit.to_numpy(
+        mico.compute_jacobian(aikit.array(td.joint_angles), all_links=True)
+    )
+    assert jacobian.shape == (6, 6)
+    assert all_jacobians.shape == (6, 6, 6)
+    assert np.allclose(all_jacobians[-1], jacobian, atol=1e-6)
+    rot_mat = aikit.to_numpy(
+        mico.compute_link_matrices(aikit.array(td.joint_angles), 6)
+    )[-1, 0:3, 0:3]
+    for j in range(6):
+        delta = np.zeros(6)
+        delta[j] = h
+        after = aikit.to_numpy(
+            mico.compute_link_matrices(aikit.array(td.joint_angles + delta), 6)
+        )
+        before = aikit.to_numpy(
+            mico.compute_link_matrices(aikit.array(td.joint_angles - delta), 6)
+        )
+        # linear velocities of every link
+        assert np.allclose(
+            all_jacobians[:, 0:3, j], (after - before)[1:, 0:3, 3] / (2 * h), atol=1e-3
+        )
+        # angular velocity of the last link, from dR/dq R^T
+        rot_vel = (after - before)[-1, 0:3, 0:3] / (2 * h)
+        skew = rot_vel @ rot_mat.T
+        assert np.allclose(
+            jacobian[3:6, j], [skew[2, 1], skew[0, 2], skew[1, 0]], atol=1e-3
+        )
+    aikit.previous_backend()
+
+
+def test_mico_inverse_kinematics(device, fw):
+    if fw == "tensorflow_graph":
+        # the working set is compacted dynamically,
+        # which makes this only valid in eager mode currently
+        pytest.skip()
+    aikit.set_backend(fw)
+    mico = MicoManipulator()
+    target_angles = np.stack([td.joint_angles, td.joint_angles * 0.5], axis=0)
+    target_matrices = mico.compute_link_matrices(
+        aikit.array(target_angles, dtype="float32"), 6
+    )[..., -1, :, :]
+    joint_angles, errors, converged = mico.solve_inverse_kinematics(
+        target_matrices,
+        num_seeds=4,
+        initial_joint_angles=aikit.array(target_angles + 0.1, dtype="float32"),
+        tolerance=1e-3,
+        seed=0,
+    )
+    assert tuple(joint_angles.shape) == (2, 6)
+    assert np.all(aikit.to_numpy(converged))
+    assert np.all(aikit.to_numpy(errors) <= 1e-3)
+    assert np.allclose(
+        mico.compute_link_matrices(joint_angles, 6)[..., -1, :, :],
+        target_matrices,
+        atol=1e-2,
+    )
+    aikit.previous_backend()
+
+
+def _planar_two_link_dynamics(q, qd, qdd, lengths, masses, izz, gravity):
+    # closed form dynamics of a planar two link arm, with centres of mass at the
+    # link midpoints, moving in the plane normal to gravity along -y
+    lc = lengths / 2
+    c2, s2 = np.cos(q[..., 1]), np.sin(q[..., 1])
+    m11 = (
+        masses[0] * lc[0] ** 2
+        + izz[0]
+        + masses[1] * (lengths[0] ** 2 + lc[1] ** 2 + 2 * lengths[0] * lc[1] * c2)
+        + izz[1]
+    )
+    m12 = masses[1] * (lc[1] ** 2 + lengths[0] * lc[1] * c2) + izz[1]
+    m22 = masses[1] * lc[1] ** 2 + izz[1]
+    h = masses[1] * lengths[0] * lc[1] * s2
+    g1 = gravity * (
+        masses[0] * lc[0] * np.cos(q[..., 0])
+        + masses[1]
+        * (lengths[0] * np.cos(q[..., 0]) + lc[1] * np.cos(q[..., 0] + q[..., 1]))
+    )
+    g2 = gravity * masses[1] * lc[1] * np.cos(q[..., 0] + q[..., 1])
+    tau1 = (
+        m11 * qdd[..., 0]
+        + m12 * qdd[..., 1]
+        - h * (2 * qd[..., 0] * qd[..., 1] + qd[..., 1] ** 2)
+        + g1
+    )
+    tau2 = m12 * qdd[..., 0] + m22 * qdd[..., 1] + h * qd[..., 0] ** 2 + g2
+    return np.stack((tau1, tau2), axis=-1)
+
+
+def test_inverse_dynamics(device, fw):
+    aikit.set_backend(fw)
+    lengths = np.array([0.7, 0.5])
+    masses = np.array([2.0, 1.5])
+    izz = np.array([0.1, 0.05])
+    manipulator = Manipulator(
+        aikit.array(lengths, dtype="float32"),
+        aikit.array([0.0, 0.0]),
+        aikit.array([0.0, 0.0]),
+        aikit.array([1.0, 1.0]),
+        aikit.array([0.0, 0.0]),
+    )
+    with pytest.raises(Exception):
+        manipulator.compute_inverse_dynamics(
+            aikit.zeros((2,)), aikit.zeros((2,)), aikit.zeros((2,))
+        )
+    manipulator.set_inertial_params(
+        masses.tolist(),
+        [[-lengths[0] / 2, 0.0, 0.0], [-lengths[1] / 2, 0.0, 0.0]],
+        [np.diag([0.01, 0.02, i]).tolist() for i in izz],
+    )
+
+    # time x batch x NJ
+    q = np.random.uniform(-np.pi, np.pi, (4, 3, 2))
+    qd = np.random.uniform(-2, 2, (4, 3, 2))
+    qdd = np.random.uniform(-2, 2, (4, 3, 2))
+    torques = manipulator.compute_inverse_dynamics(
+        aikit.array(q, dtype="float32"),
+        aikit.array(qd, dtype="float32"),
+        aikit.array(qdd, dtype="float32"),
+        gravity=[0.0, -9.81, 0.0],
+    )
+    assert tuple(torques.shape) == (4, 3, 2)
+    assert np.allclose(
+        torques,
+        _planar_two_link_dynamics(q, qd, qdd, lengths, masses, izz, 9.81),
+        atol=1e-3,
+    )
+
+    # static gravity torques
+    zeros = np.zeros_like(q)
+    assert np.allclose(
+        manipulator.compute_inverse_dynamics(
+            aikit.array(q, dtype="float32"),
+            aikit.array(zeros, dtype="float32"),
+            aikit.array(zeros, dtype="float32"),
+            gravity=[0.0, -9.81, 0.0],
+        ),
+        _planar_two_link_dynamics(q, zeros, zeros, lengths, masses, izz, 9.81),
+        atol=1e-3,
+    )
+    aikit.previous_backend()
+
+
+def test_manipulability_metrics(device, fw):
+    aikit.set_backend(fw)
+    lengths = np.array([0.7, 0.5])
+    manipulator = Manipulator(
+        aikit.array(lengths, dtype="float32"),
+        aikit.array([0.0, 0.0]),
+        aikit.array([0.0, 0.0]),
+        aikit.array([1.0, 1.0]),
+        aikit.array([0.0, 0.0]),
+    )
+
+    # batch x time x NJ, with the arm outstretched at the first time step
+    q = np.random.uniform(-np.pi, np.pi, (3, 5, 2))
+    q[:, 0, 1] = 0.0
+    (
+        manipulability,
+        min_singular_values,
+        condition_numbers,
+        singular,
+    ) = manipulator.compute_manipulability_metrics(
+        aikit.array(q, dtype="float32"), translational_only=True
+    )
+    assert tuple(manipulability.shape) == (3, 5)
+    assert np.allclose(
+        manipulability, lengths[0] * lengths[1] * np.abs(np.sin(q[..., 1])), atol=1e-4
+    )
+    assert np.all(aikit.to_numpy(singular)[:, 0])
+    assert np.all(aikit.to_numpy(min_singular_values) >= 0)
+    assert np.all(aikit.to_numpy(condition_numbers) >= 1)
+
+    # the manipulability of a full rank six joint arm is sqrt(det(J J^T))
+    mico = MicoManipulator()
+    joint_angles = aikit.array(
+        np.random.uniform(-np.pi, np.pi, (4, 6)), dtype="float32"
+    )
+    jacobians = aikit.to_numpy(mico.compute_jacobian(joint_angles))
+    assert np.allclose(
+        mico.compute_manipulability_metrics(joint_angles)[0],
+        np.sqrt(np.linalg.det(np.matmul(jacobians, np.swapaxes(jacobians, -1, -2)))),
+        rtol=1e-3,
+        atol=1e-5,
+    )
+    aikit.previous_backend()
+
+
+def test_sample_mico_swept_links(device, fw):
+    if fw == "tensorflow_graph":
+        # the need to dynamically infer array shapes
+        # makes this only valid in eager mode currently
+        pytest.skip()
+    aikit.set_backend(fw)
+    mico = MicoManipulator()
+
+    # batch x time x NJ
+    joint_angles = np.stack(
+        [td.joint_angles, td.joint_angles + 0.1, td.joint_angles + 0.3], axis=0
+    )
+    joint_angles = aikit.array(np.tile(np.expand_dims(joint_angles, 0), (2, 1, 1)))
+    num_samples = td.sampled_link.shape[-2]
+
+    # consecutive configurations are included at both ends of each interval
+    swept = mico.sample_swept_links(joint_angles, num_substeps=4)
+    assert tuple(swept.shape) == (2, 2, 5 * num_samples, 3)
+    samples = mico.sample_links(joint_angles)
+    assert np.allclose(swept[..., 0:num_samples, :], samples[..., :-1, :, :])
+    assert np.allclose(swept[..., -num_samples:, :], samples[..., 1:, :, :])
+
+    # substeps follow the link arcs, sampled at the interpolated joint angles
+    midpoints = (joint_angles[..., :-1, :] + joint_angles[..., 1:, :]) / 2
+    swept = mico.sample_swept_links(joint_angles, num_substeps=2)
+    assert np.allclose(
+        swept[..., num_samples : 2 * num_samples, :],
+        mico.sample_links(midpoints),
+        atol=1e-5,
+    )
+
+    # the default number of substeps keeps substeps within one sample spacing,
+    # which bounds the chord between them by their arc
+    swept = aikit.to_numpy(mico.sample_swept_links(joint_angles))
+    num_substeps = swept.shape[-2] // num_samples - 1
+    swept = np.reshape(swept, (2, 2, num_substeps + 1, num_samples, 3))
+    substep_displacements = np.linalg.norm(np.diff(swept, axis=-3), axis=-1)
+    assert np.all(substep_displacements <= 1 / 25 + 1e-5)
+    aikit.previous_backend()
+
+
+def test_mico_link_geometry(device, fw):
+    aikit.set_backend(fw)
+    mico = MicoManipulator()
+    joint_angles = aikit.array(np.tile(np.expand_dims(td.joint_angles, 0), (5, 1)))
+    link_positions = aikit.to_numpy(mico.compute_link_matrices(joint_angles, 6))[
+        ..., 0:3, 3
+    ]
+
+    # capsules run between consecutive link frame origins
+    starts, ends, radii = mico.compute_link_capsules(joint_angles)
+    assert np.allclose(starts, link_positions[..., :-1, :], atol=1e-6)
+    assert np.allclose(ends, link_positions[..., 1:, :], atol=1e-6)
+    assert np.allclose(radii, 0.1 * np.array(mico._link_lengths))
+    mico.set_link_radii([0.05] * 6)
+    assert np.allclose(mico.compute_link_capsules(joint_angles)[2], 0.05)
+
+    # spheres cover the link cylinders
+    centres, sphere_radii = mico.compute_link_spheres(joint_angles, spheres_per_link=3)
+    assert tuple(centres.shape) == (5, 18, 3)
+    assert tuple(sphere_radii.shape) == (18,)
+    assert np.all(aikit.to_numpy(sphere_radii) >= 0.05)
+
+    # link samples lie on the capsule axes, at zero distance from the axes
+    points = mico.sample_links(joint_angles, 6)
+    distances = mico.compute_link_distances(joint_angles, points)
+    assert tuple(distances.shape) == (5, points.shape[-2], 6)
+    assert np.allclose(aikit.to_numpy(distances).min(axis=-1), -0.05, atol=1e-5)
+    sphere_distances = mico.compute_link_distances(
+        joint_angles, points, point_radii=aikit.ones((points.shape[-2],)) * 0.1
+    )
+    assert np.allclose(sphere_distances, aikit.to_numpy(distances) - 0.1, atol=1e-6)
+    aikit.previous_backend()
+
+
+def test_self_collisions(device, fw):
+    aikit.set_backend(fw)
+    manipulator = Manipulator(
+        aikit.array([1.0, 1.0, 1.0]),
+        aikit.array([0.0, 0.0, 0.0]),
+        aikit.array([0.0, 0.0, 0.0]),
+        aikit.array([1.0, 1.0, 1.0]),
+        aikit.array([0.0, 0.0, 0.0]),
+    )
+    assert manipulator._self_collision_pairs == [(1, 3)]
+
+    # batch x time x NJ, with the last link folded back onto the first link, or
+    # parallel to it at a distance of one
+    joint_angles = aikit.array(
+        [[[0.0, np.pi, np.pi], [0.0, np.pi / 2, np.pi / 2]]] * 2, dtype="float32"
+    )
+    min_distances, colliding = manipulator.check_self_collisions(joint_angles)
+    assert tuple(min_distances.shape) == (2, 2)
+    assert np.allclose(min_distances, [[-0.2, 0.8]] * 2, atol=1e-5)
+    assert np.array_equal(aikit.to_numpy(colliding), [[True, False]] * 2)
+
+    # the safety margin only changes the collision mask, not the distances
+    min_distances, colliding = manipulator.check_self_collisions(
+        joint_angles, safety_margin=-0.5
+    )
+    assert np.allclose(min_distances, [[-0.2, 0.8]] * 2, atol=1e-5)
+    assert not np.any(aikit.to_numpy(colliding))
+
+    # adjacent links are only checked if requested
+    min_distances, colliding = manipulator.check_self_collisions(
+        joint_angles, link_pairs=[(1, 2)]
+    )
+    assert np.allclose(min_distances[..., 0], -0.2, atol=1e-5)
+    assert np.allclose(min_distances[..., 1], -0.2, atol=1e-5)
     aikit.previous_backend()
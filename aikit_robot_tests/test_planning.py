@@ -4,6 +4,7 @@ Collection of tests for unified linear algebra functions
 
 # global
 import aikit
+import pytest
 import numpy as np
 
 # local
@@ -44,3 +45,249 @@ def test_spline_interpolation(device, fw):
         atol=1e-2,
     )
     aikit.previous_backend()
+
+
+def test_fit_spline_path(device, fw):
+    aikit.set_backend(fw)
+    spline_path = aikit_robot.planning.fit_spline_path(
+        aikit.array(td.train_points_3d), aikit.array(td.train_values_3d)
+    )
+    for _ in range(2):
+        assert np.allclose(
+            spline_path.sample(aikit.array(td.query_points_3d)),
+            td.query_values_3d,
+            atol=1e-2,
+        )
+    assert np.allclose(
+        spline_path.sample(aikit.array(td.train_points_3d)),
+        td.train_values_3d,
+        atol=1e-2,
+    )
+    aikit.previous_backend()
+
+
+def test_spline_basis(device, fw):
+    aikit.set_backend(fw)
+    aikit_robot.planning.clear_spline_basis_cache()
+    anchor_points = aikit.array(td.train_points_3d)
+    query_points = aikit.array(td.query_points_3d)
+    basis = aikit_robot.planning.spline_basis(anchor_points, query_points)
+    assert tuple(basis.shape) == (1, 5)
+    assert aikit_robot.planning.spline_basis(anchor_points, query_points) is basis
+    assert np.allclose(
+        aikit_robot.planning.sample_spline_path_from_basis(
+            basis, aikit.array(td.train_values_3d)
+        ),
+        td.query_values_3d,
+        atol=1e-2,
+    )
+    aikit.previous_backend()
+
+
+def test_spline_solvers(device, fw):
+    aikit.set_backend(fw)
+    anchor_points = aikit.array(td.train_points_3d)
+    anchor_vals = aikit.array(td.train_values_3d)
+    sample_points = aikit.astype(
+        aikit.expand_dims(aikit.linspace(0.0, 1.0, 11), axis=-1), "float32"
+    )
+    schur_path = aikit_robot.planning.sample_spline_path(
+        anchor_points, anchor_vals, sample_points, solver="schur"
+    )
+    pinv_path = aikit_robot.planning.sample_spline_path(
+        anchor_points, anchor_vals, sample_points, solver="pinv"
+    )
+    assert np.allclose(schur_path, pinv_path, atol=1e-3)
+    aikit.previous_backend()
+
+
+def test_spline_solver_fallback(device, fw):
+    aikit.set_backend(fw)
+    # batch of a layout with a duplicate anchor, for which the kernel block is
+    # singular, and a regular layout
+    duplicate_points = td.train_points_3d[[0, 1, 2, 2, 4]]
+    duplicate_vals = td.train_values_3d[[0, 1, 2, 2, 4]]
+    anchor_points = aikit.array(np.stack([duplicate_points, td.train_points_3d]))
+    anchor_vals = aikit.array(np.stack([duplicate_vals, td.train_values_3d]))
+    sample_points = aikit.astype(
+        aikit.expand_dims(aikit.linspace(0.0, 1.0, 11), axis=-1), "float32"
+    )
+    with aikit_robot.profiling.profile() as stats:
+        auto_path = aikit_robot.planning.sample_spline_path(
+            anchor_points, anchor_vals, sample_points, solver="auto"
+        )
+    assert stats.counters["spline_pinv_fallbacks"] >= 1
+    pinv_path = aikit_robot.planning.sample_spline_path(
+        anchor_points[0], anchor_vals[0], sample_points, solver="pinv"
+    )
+    schur_path = aikit_robot.planning.sample_spline_path(
+        anchor_points[1], anchor_vals[1], sample_points, solver="schur"
+    )
+    assert np.all(np.isfinite(aikit.to_numpy(auto_path)))
+    assert np.allclose(auto_path[0], pinv_path, atol=1e-4)
+    assert np.allclose(auto_path[1], schur_path, atol=1e-3)
+    assert np.allclose(
+        aikit_robot.planning.sample_spline_path(
+            anchor_points[0], anchor_vals[0], anchor_points[0], solver="auto"
+        ),
+        duplicate_vals,
+        atol=1e-2,
+    )
+    aikit.previous_backend()
+
+
+def test_local_spline_bases(device, fw):
+    aikit.set_backend(fw)
+    anchor_points = aikit.array(td.train_points_3d)
+    anchor_vals = aikit.array(td.train_values_3d)
+    assert np.allclose(
+        aikit_robot.planning.sample_spline_path(
+            anchor_points, anchor_vals, anchor_points, basis="catmull_rom"
+        ),
+        td.train_values_3d,
+        atol=1e-5,
+    )
+    v = td.train_values_3d
+    assert np.allclose(
+        aikit_robot.planning.sample_spline_path(
+            anchor_points,
+            anchor_vals,
+            aikit.array([[0.5]], dtype="float32"),
+            basis="bspline",
+        ),
+        (v[1:2] + 4 * v[2:3] + v[3:4]) / 6,
+        atol=1e-5,
+    )
+    aikit.previous_backend()
+
+
+def test_iterate_spline_path(device, fw):
+    aikit.set_backend(fw)
+    anchor_points = aikit.array(td.train_points_3d)
+    anchor_vals = aikit.array(td.train_values_3d)
+    sample_points = aikit.astype(
+        aikit.expand_dims(aikit.linspace(0.0, 1.0, 11), axis=-1), "float32"
+    )
+    chunks = list(
+        aikit_robot.planning.iterate_spline_path(
+            anchor_points, anchor_vals, sample_points, chunk_size=4
+        )
+    )
+    assert [chunk.shape[-2] for chunk in chunks] == [4, 4, 3]
+    assert np.allclose(
+        aikit.concat(chunks, axis=-2),
+        aikit_robot.planning.sample_spline_path(
+            anchor_points, anchor_vals, sample_points
+        ),
+        atol=1e-5,
+    )
+    aikit.previous_backend()
+
+
+def test_spline_derivatives(device, fw):
+    aikit.set_backend(fw)
+    anchor_points = aikit.array(td.train_points_3d)
+    anchor_vals = aikit.array(td.train_values_3d)
+    h = 1e-2
+    sample_points = np.array([[0.3], [0.6]]).astype(np.float32)
+    for basis in ["rbf", "catmull_rom"]:
+        spline_path = aikit_robot.planning.fit_spline_path(
+            anchor_points, anchor_vals, basis=basis
+        )
+        positions, velocities, accelerations = spline_path.sample_with_derivatives(
+            aikit.array(sample_points)
+        )
+        before = spline_path.sample(aikit.array(sample_points - h))
+        after = spline_path.sample(aikit.array(sample_points + h))
+        assert np.allclose(
+            positions, spline_path.sample(aikit.array(sample_points)), atol=1e-5
+        )
+        assert np.allclose(velocities, (after - before) / (2 * h), atol=5e-2)
+        assert np.allclose(
+            accelerations, (after - 2 * positions + before) / h**2, atol=5e-1
+        )
+    aikit.previous_backend()
+
+
+def test_incremental_spline_path(device, fw):
+    aikit.set_backend(fw)
+    sample_points = aikit.array(td.train_points_3d)
+    spline_path = aikit_robot.planning.IncrementalSplinePath(
+        aikit.array(td.train_points_3d[[0, 1, 3, 4]]),
+        aikit.array(td.train_values_3d[[0, 1, 3, 4]]),
+    )
+    spline_path.insert_anchor(
+        aikit.array(td.train_points_3d[2]), aikit.array(td.train_values_3d[2]), 2
+    )
+    assert np.allclose(spline_path.sample(sample_points), td.train_values_3d, atol=1e-2)
+    spline_path.remove_anchor(2)
+    spline_path.move_anchor(
+        2, aikit.array(td.train_points_3d[2]), aikit.array(td.train_values_3d[2])
+    )
+    spline_path.insert_anchor(
+        aikit.array(td.train_points_3d[3]), aikit.array(td.train_values_3d[3]), 3
+    )
+    assert np.allclose(spline_path.sample(sample_points), td.train_values_3d, atol=1e-2)
+    aikit.previous_backend()
+
+
+def test_shared_anchor_layout(device, fw):
+    aikit.set_backend(fw)
+    anchor_points = aikit.array(td.train_points_3d)
+    batched_vals = np.stack(
+        [td.train_values_3d, td.train_values_3d * 2, td.train_values_3d - 1], axis=0
+    )
+    sample_points = aikit.array(td.train_points_3d)
+    for basis in ["rbf", "catmull_rom"]:
+        sampled = aikit_robot.planning.sample_spline_path(
+            anchor_points, aikit.array(batched_vals), sample_points, basis=basis
+        )
+        assert tuple(sampled.shape) == (3, 5, 3)
+        assert np.allclose(sampled, batched_vals, atol=1e-2)
+    aikit.previous_backend()
+
+
+def test_spline_basis_gradients(device, fw):
+    if fw == "numpy":
+        # numpy does not support gradients
+        pytest.skip()
+    aikit.set_backend(fw)
+    basis = aikit_robot.planning.spline_basis(
+        aikit.array(td.train_points_3d), aikit.array(td.query_points_3d)
+    )
+    _, grads = aikit.execute_with_gradients(
+        lambda x: aikit.sum(
+            aikit_robot.planning.sample_spline_path_from_basis(basis, x)
+        ),
+        aikit.array(td.train_values_3d),
+    )
+    assert np.allclose(
+        grads,
+        np.tile(np.sum(aikit.to_numpy(basis), axis=0)[:, None], (1, 3)),
+        atol=1e-5,
+    )
+    aikit.previous_backend()
+
+
+def test_spline_profiling(device, fw):
+    aikit.set_backend(fw)
+    with aikit_robot.profiling.profile() as stats:
+        aikit_robot.planning.sample_spline_path(
+            aikit.array(td.train_points_3d),
+            aikit.array(td.train_values_3d),
+            aikit.array(td.query_points_3d),
+        )
+    assert stats.counters["spline_fits"] == 1
+    assert stats.calls["spline_kernel"] >= 1
+    assert stats.calls["spline_solve"] >= 1
+    assert stats.calls["spline_sample"] == 1
+    assert all(t >= 0 for t in stats.times.values())
+    # the default solver does not check the residual of the fit
+    assert "spline_residual" not in stats.calls
+    aikit_robot.planning.sample_spline_path(
+        aikit.array(td.train_points_3d),
+        aikit.array(td.train_values_3d),
+        aikit.array(td.query_points_3d),
+    )
+    assert stats.counters["spline_fits"] == 1
+    aikit.previous_backend()